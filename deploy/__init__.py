@@ -0,0 +1 @@
+# Deploy module for orchestrating the infrastructure 
\ No newline at end of file
@@ -0,0 +1,297 @@
+"""
+Automation API driver
+
+Runs the Pulumi program (deploy.program.run) inline for several stacks at once,
+with a bounded worker pool, one log file per stack and a timing summary.
+
+Example:
+    python -m deploy.driver --stack dev --stack staging --preview
+    python -m deploy.driver --stack dev --stack team-a --config volume_attach_mode=launch \
+        --stack-config team-a:deployment_mode=fleet --workers 2
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional
+
+import yaml
+
+PROJECT_NAME = "ec2-package"
+DEFAULT_BACKEND = "file://~/.pulumi-local-state"
+DEFAULT_LOG_DIR = ".pulumi-driver"
+
+# Repository root: the Pulumi.yaml and Pulumi.<stack>.yaml files live here
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Stack file settings Pulumi writes when it creates a stack's secrets provider
+SECRETS_SETTINGS = ("secretsprovider", "encryptedkey", "encryptionsalt")
+
+def resolve_backend(backend: str) -> str:
+    """
+    Expand a file:// backend URL and make sure its directory exists.
+
+    Args:
+        backend: Backend URL (file://, s3://, https://, ...)
+
+    Returns:
+        Backend URL with ~ and relative paths resolved
+    """
+    if not backend.startswith("file://"):
+        return backend
+
+    path = os.path.abspath(os.path.expanduser(backend[len("file://"):]))
+    os.makedirs(path, exist_ok=True)
+    return f"file://{path}"
+
+def prepare_workspace(stack_name: str, stack_dir: str) -> str:
+    """
+    Build a per-stack copy of the project, so driver config never lands in the repo's stack files.
+
+    Pulumi.yaml and the repo's Pulumi.<stack>.yaml are copied fresh on every
+    run; secrets provider settings Pulumi added to an earlier copy are kept,
+    so secrets in the stack's state stay readable.
+
+    Args:
+        stack_name: Stack name (org/project/stack or just stack)
+        stack_dir: The stack's driver directory
+
+    Returns:
+        Workspace directory to use as the Automation API work_dir
+    """
+    work_dir = os.path.join(stack_dir, "workspace")
+    os.makedirs(work_dir, exist_ok=True)
+    shutil.copyfile(os.path.join(PROJECT_DIR, "Pulumi.yaml"), os.path.join(work_dir, "Pulumi.yaml"))
+
+    stack_file = f"Pulumi.{stack_name.split('/')[-1]}.yaml"
+
+    def load(path: str) -> Dict[str, Any]:
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return yaml.safe_load(f) or {}
+
+    settings = load(os.path.join(PROJECT_DIR, stack_file))
+    previous = load(os.path.join(work_dir, stack_file))
+    for key in SECRETS_SETTINGS:
+        if key not in settings and key in previous:
+            settings[key] = previous[key]
+
+    with open(os.path.join(work_dir, stack_file), "w") as f:
+        yaml.safe_dump(settings, f, default_flow_style=False)
+    return work_dir
+
+def run_stack(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Preview or update one stack with the inline program. Runs inside a pool worker.
+
+    Args:
+        spec: Stack spec with stack, config, backend, log_dir and preview
+
+    Returns:
+        Result dictionary (stack, operation, status, duration, changes, error, log)
+    """
+    # Imported here so each worker process sets up its own Pulumi runtime
+    import pulumi.automation as auto
+    import deploy.program as program
+    import timing.phases as timing
+
+    stack_name = spec["stack"]
+    operation = "preview" if spec["preview"] else "up"
+    stack_dir = os.path.join(spec["log_dir"], stack_name)
+    os.makedirs(stack_dir, exist_ok=True)
+    log_path = os.path.join(stack_dir, f"{operation}.log")
+
+    result: Dict[str, Any] = {
+        "stack": stack_name,
+        "operation": operation,
+        "status": "failed",
+        "duration": 0.0,
+        "changes": {},
+        "error": None,
+        "log": log_path
+    }
+
+    # Every stack gets its own SSH key so concurrent runs don't race on ./ec2_key
+    config = {"key_path": os.path.join(stack_dir, "ec2_key")}
+    # ...and its own trace file when tracing is switched on for the whole driver
+    if os.environ.get(timing.TRACE_FILE_ENV):
+        config["trace_file"] = os.path.join(stack_dir, f"{operation}-trace.json")
+    config.update(spec["config"])
+
+    start = time.perf_counter()
+    work_dir = prepare_workspace(stack_name, stack_dir)
+    with open(log_path, "w") as log_file:
+        def on_output(line: str):
+            log_file.write(line + "\n")
+            log_file.flush()
+
+        try:
+            stack = auto.create_or_select_stack(
+                stack_name=stack_name,
+                project_name=PROJECT_NAME,
+                program=program.run,
+                opts=auto.LocalWorkspaceOptions(
+                    work_dir=work_dir,
+                    env_vars={"PULUMI_BACKEND_URL": spec["backend"]}
+                )
+            )
+            stack.set_all_config({
+                key: auto.ConfigValue(value=str(value)) for key, value in config.items()
+            })
+
+            if spec["preview"]:
+                preview_result = stack.preview(on_output=on_output, color="never")
+                changes = preview_result.change_summary
+            else:
+                up_result = stack.up(on_output=on_output, color="never")
+                changes = up_result.summary.resource_changes or {}
+
+            # OpType keys are enums; plain strings keep the result picklable
+            result["changes"] = {str(getattr(op, "value", op)): count for op, count in changes.items()}
+            result["status"] = "succeeded"
+        except Exception as error:
+            log_file.write(traceback.format_exc())
+            result["error"] = str(error).strip().splitlines()[-1] if str(error).strip() else type(error).__name__
+        finally:
+            # Workers run several stacks in turn: write this stack's trace before the next one starts
+            timing.finish()
+
+    result["duration"] = time.perf_counter() - start
+    return result
+
+def run_stacks(stacks: List[str], config: Optional[Dict[str, str]] = None, stack_config: Optional[Dict[str, Dict[str, str]]] = None, backend: str = DEFAULT_BACKEND, preview: bool = False, workers: int = 4, log_dir: str = DEFAULT_LOG_DIR) -> List[Dict[str, Any]]:
+    """
+    Run the program for several stacks concurrently.
+
+    Args:
+        stacks: Stack names
+        config: Config overrides applied to every stack
+        stack_config: Per-stack config overrides, keyed by stack name
+        backend: Backend URL (file:// works offline)
+        preview: Only preview, don't update
+        workers: Maximum number of stacks running at once, each in its own process
+        log_dir: Directory for per-stack logs and SSH keys
+
+    Returns:
+        List of result dictionaries, in the order the stacks were given
+    """
+    backend = resolve_backend(backend)
+    log_dir = os.path.abspath(log_dir)
+
+    specs = []
+    for stack_name in stacks:
+        stack_overrides = dict(config or {})
+        stack_overrides.update((stack_config or {}).get(stack_name, {}))
+        specs.append({
+            "stack": stack_name,
+            "config": stack_overrides,
+            "backend": backend,
+            "log_dir": log_dir,
+            "preview": preview
+        })
+
+    # One process per running stack: the Pulumi runtime, the key material cache and
+    # the phase timings are process-wide. spawn: gRPC threads must not be forked.
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with pool:
+        futures = {pool.submit(run_stack, spec): spec["stack"] for spec in specs}
+        for future in as_completed(futures):
+            stack_name = futures[future]
+            try:
+                result = future.result()
+            except Exception as error:
+                result = {
+                    "stack": stack_name,
+                    "operation": "preview" if preview else "up",
+                    "status": "failed",
+                    "duration": 0.0,
+                    "changes": {},
+                    "error": str(error),
+                    "log": ""
+                }
+            results[stack_name] = result
+            print(f"[{result['stack']}] {result['operation']} {result['status']} in {result['duration']:.1f}s", flush=True)
+
+    return [results[stack_name] for stack_name in stacks]
+
+def format_summary(results: List[Dict[str, Any]]) -> str:
+    """
+    Render the results as a plain-text table.
+
+    Args:
+        results: Result dictionaries from run_stacks
+
+    Returns:
+        Summary table as string
+    """
+    headers = ["STACK", "OPERATION", "STATUS", "DURATION", "CHANGES", "LOG"]
+    rows = []
+    for result in results:
+        changes = ", ".join(f"{op}={count}" for op, count in sorted(result["changes"].items())) or "-"
+        if result["error"]:
+            changes = f"error: {result['error']}"
+        rows.append([
+            result["stack"],
+            result["operation"],
+            result["status"],
+            f"{result['duration']:.1f}s",
+            changes,
+            result["log"]
+        ])
+
+    widths = [max(len(str(row[i])) for row in [headers] + rows) for i in range(len(headers))]
+    lines = ["  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)).rstrip() for row in [headers] + rows]
+    total = sum(result["duration"] for result in results)
+    lines.append(f"{len(results)} stack(s), {sum(r['status'] == 'succeeded' for r in results)} succeeded, {total:.1f}s of stack time")
+    return "\n".join(lines)
+
+def _parse_assignment(value: str) -> tuple:
+    if "=" not in value:
+        raise argparse.ArgumentTypeError(f"Expected key=value, got: {value}")
+    key, _, setting = value.partition("=")
+    return key, setting
+
+def _parse_stack_assignment(value: str) -> tuple:
+    stack_name, separator, assignment = value.partition(":")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"Expected stack:key=value, got: {value}")
+    return (stack_name,) + _parse_assignment(assignment)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the Pulumi program for several stacks concurrently.")
+    parser.add_argument("--stack", dest="stacks", action="append", required=True, help="Stack name (repeatable)")
+    parser.add_argument("--config", action="append", type=_parse_assignment, default=[], help="key=value override for every stack (repeatable)")
+    parser.add_argument("--stack-config", action="append", type=_parse_stack_assignment, default=[], help="stack:key=value override for one stack (repeatable)")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, help=f"Backend URL (default: {DEFAULT_BACKEND})")
+    parser.add_argument("--preview", action="store_true", help="Only preview the changes")
+    parser.add_argument("--workers", type=int, default=4, help="Maximum stacks running at once (default: 4)")
+    parser.add_argument("--log-dir", default=DEFAULT_LOG_DIR, help=f"Per-stack log and workspace directory (default: {DEFAULT_LOG_DIR})")
+    args = parser.parse_args(argv)
+
+    stack_config: Dict[str, Dict[str, str]] = {}
+    for stack_name, key, value in args.stack_config:
+        stack_config.setdefault(stack_name, {})[key] = value
+
+    results = run_stacks(
+        args.stacks,
+        config=dict(args.config),
+        stack_config=stack_config,
+        backend=args.backend,
+        preview=args.preview,
+        workers=args.workers,
+        log_dir=args.log_dir
+    )
+    print(format_summary(results))
+
+    return 0 if all(result["status"] == "succeeded" for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import os
+import deploy.regions as regions
+import output.outputs as outputs
+import raid.examples as raid_examples
+import keys.keypair as keypair
+import timing.phases as timing
+import pulumi
+from typing import Dict, Any
+
+def _get_int(config: pulumi.Config, key: str, default: int) -> int:
+    """Read an integer config value, keeping an explicit 0."""
+    value = config.get_int(key)
+    return default if value is None else value
+
+def get_settings(config: pulumi.Config) -> Dict[str, Any]:
+    """
+    Read deployment settings from stack config.
+
+    Args:
+        config: Project config
+
+    Returns:
+        Settings dictionary passed to deploy.regions.deploy_region
+    """
+    # "instance" launches a single EC2 instance, "fleet" a launch template + Auto Scaling Group
+    deployment_mode = config.get("deployment_mode") or "instance"
+    if deployment_mode not in ("instance", "fleet"):
+        raise ValueError(f"Unsupported deployment_mode: {deployment_mode}")
+
+    # "attached" hot-attaches volumes after boot (volumes outlive the instance),
+    # "launch" maps them at launch so they exist before user data runs
+    volume_attach_mode = config.get("volume_attach_mode") or "attached"
+    if volume_attach_mode not in ("attached", "launch"):
+        raise ValueError(f"Unsupported volume_attach_mode: {volume_attach_mode}")
+
+    return {
+        "deployment_mode": deployment_mode,
+        # Fleet instances come and go, so their volumes are always mapped at launch
+        "attach_at_launch": volume_attach_mode == "launch" or deployment_mode == "fleet",
+        "bake_image": bool(config.get_bool("bake_image")),
+        "fleet_min_size": _get_int(config, "fleet_min_size", 1),
+        "fleet_max_size": _get_int(config, "fleet_max_size", 3),
+        "fleet_desired_capacity": config.get_int("fleet_desired_capacity"),
+        "fleet_warm_pool_size": _get_int(config, "fleet_warm_pool_size", 0),
+        "logical_volume_count": _get_int(config, "logical_volume_count", 2),
+        # Where the SSH key pair is kept (the driver gives every stack its own)
+        "key_path": config.get("key_path") or keypair.PRIVATE_KEY_PATH,
+        # "volume-name=/dev/sdX" pins from a previous update (see the device_assignments output)
+        "device_assignments": dict(
+            entry.split("=", 1) for entry in config.get_object("device_assignments") or []
+        ),
+        # fio job matrix after the volume is mounted; unset values use raid.benchmark's defaults
+        "benchmark": {
+            "queue_depth": config.get_int("benchmark_queue_depth"),
+            "runtime": config.get_int("benchmark_runtime"),
+            "size": config.get("benchmark_size"),
+            "publish": config.get("benchmark_publish"),
+        } if config.get_bool("benchmark") else None,
+    }
+
+def export_outputs(deployments, explicit_provider: bool):
+    """Export the stack outputs for the deployed regions."""
+    # Export logical volume information
+    pulumi.export("logical_volume_devices", deployments[0]["device_names"])
+    pulumi.export("device_assignments", deployments[0]["device_assignments"])
+    pulumi.export("logical_volume_mount_point", raid_examples.LOGICAL_VOLUME_MOUNT_POINT)
+    pulumi.export("logical_volume_filesystem", raid_examples.LOGICAL_VOLUME_FILESYSTEM)
+    pulumi.export("logical_volume_description", "Logical Volume Management without RAID")
+    pulumi.export("logical_volume_planned_performance", deployments[0]["planned_performance"])
+    if deployments[0]["benchmark_results"] is not None:
+        pulumi.export("logical_volume_benchmark", deployments[0]["benchmark_results"])
+
+    if len(deployments) > 1 or explicit_provider:
+        outputs.export_region_outputs(deployments)
+        return
+
+    deployment = deployments[0]
+    if deployment["golden_image_id"] is not None:
+        pulumi.export("golden_image_id", deployment["golden_image_id"])
+    if deployment["fleet"] is not None:
+        outputs.export_fleet_outputs(deployment["fleet"], deployment["keys"])
+    else:
+        outputs.export_outputs(deployment["instance"], deployment["keys"])
+    outputs.export_storage_outputs(deployment["arrays"], deployment["connection"])
+
+def run():
+    """Pulumi program: deploy every configured region and export the outputs."""
+    config = pulumi.Config()
+
+    # Opt-in phase timing; every run starts a fresh trace (the driver runs
+    # several stacks per process and finishes each one's trace)
+    trace_file = config.get("trace_file") or os.environ.get(timing.TRACE_FILE_ENV)
+    if trace_file:
+        timing.enable(trace_file)
+
+    with timing.phase("read_config"):
+        settings = get_settings(config)
+        region_configs = regions.get_region_configs(config)
+
+    # Resources in every region are registered together, so Pulumi provisions them in parallel
+    deployments = [
+        regions.deploy_region(
+            region_config["region"],
+            region_config["availability_zones"],
+            settings,
+            explicit_provider=region_config["explicit_provider"]
+        )
+        for region_config in region_configs
+    ]
+
+    with timing.phase("export_outputs"):
+        export_outputs(deployments, region_configs[0]["explicit_provider"])
+
+    # Pulumi finishes registering resources after this function returns; the
+    # phase ends when the driver's stack operation returns or the process exits
+    timing.begin("resource_registration")
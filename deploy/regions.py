@@ -0,0 +1,199 @@
+import vpc.vpc as vpc
+import sg.security as security
+import keys.keypair as keypair
+import ec2.instance as instance
+import ec2.fleet as instance_fleet
+import ebs.volumes as ebs
+import ebs.device_slots as device_slots
+import image.bake as image_bake
+import raid.examples as raid_examples
+import raid.benchmark as benchmark
+import output.schema as schema
+import pulumi
+import pulumi_aws as aws
+import timing.phases as timing
+from typing import Dict, Any, List, Optional
+
+def get_region_configs(config: pulumi.Config) -> List[Dict[str, Any]]:
+    """
+    Read the regions to deploy into from stack config.
+
+    `regions` lists the regions to deploy into, each with its own provider.
+    `availability_zones` lists AZs by full name; each region uses the ones
+    belonging to it (default: that region's "a" zone). Without `regions`,
+    a single region is deployed into `aws:region` with the default provider.
+
+    Args:
+        config: Project config
+
+    Returns:
+        List of region configurations
+    """
+    availability_zones = config.get_object("availability_zones") or []
+
+    def zones_for(region: str) -> List[str]:
+        zones = [zone for zone in availability_zones if zone[:-1] == region]
+        return zones or [f"{region}a"]
+
+    regions = config.get_object("regions")
+    if regions:
+        return [
+            {
+                "region": region,
+                "availability_zones": zones_for(region),
+                # Every region gets its own provider and prefixed resource names
+                "explicit_provider": True
+            }
+            for region in regions
+        ]
+
+    region = pulumi.Config("aws").get("region") or "eu-west-2"
+    return [{
+        "region": region,
+        "availability_zones": zones_for(region),
+        "explicit_provider": False
+    }]
+
+@timing.traced()
+def deploy_region(region: str, availability_zones: List[str], settings: Dict[str, Any], explicit_provider: bool = True) -> Dict[str, Any]:
+    """
+    Create the VPC, security group, key pair, instance (or fleet) and EBS volumes in one region.
+
+    Args:
+        region: AWS region
+        availability_zones: AZs for the region's public subnets
+        settings: Deployment settings (deployment_mode, attach_at_launch, bake_image, fleet sizing)
+        explicit_provider: Use a dedicated aws.Provider and region-prefixed resource names;
+            False keeps the default provider and the original resource names
+
+    Returns:
+        Dictionary containing the region's resources
+    """
+    name_prefix = ""
+    opts = None
+    if explicit_provider:
+        name_prefix = f"{region}-"
+        provider = aws.Provider(f"{region}-provider", region=region)
+        opts = pulumi.ResourceOptions(provider=provider)
+
+    attach_at_launch = settings["attach_at_launch"]
+
+    vpc_info = vpc.setup_vpc(availability_zones, name_prefix=name_prefix, opts=opts)
+    sec_group = security.create_ssh_security_group(vpc_info["vpc_id"], name_prefix=name_prefix, opts=opts)
+    keys = keypair.generate_keypair(name_prefix=name_prefix, opts=opts, private_key_path=settings["key_path"])
+
+    # Optionally bake a golden image in this update; otherwise the newest image
+    # baked for this stack is picked up by the launchers if one exists
+    golden_image_id = None
+    if settings["bake_image"]:
+        golden_image = image_bake.create_golden_image(vpc_info, sec_group, name_prefix=name_prefix, opts=opts)
+        golden_image_id = golden_image["ami_id"]
+
+    # Optional fio benchmark once the logical volume is mounted
+    benchmark_config = None
+    benchmark_policy = None
+    if settings["benchmark"] is not None:
+        benchmark_config = benchmark.get_benchmark_config("logical-volume", settings["benchmark"])
+        benchmark_policy = benchmark.get_benchmark_policy(benchmark_config)
+
+    # Create logical volume configuration; recorded assignments keep volumes
+    # on their devices when members are added or removed
+    allocator = device_slots.DeviceSlotAllocator(existing=settings["device_assignments"])
+    device_names, logical_volume_user_data, volume_configs = raid_examples.create_logical_volume_setup(
+        attach_at_launch,
+        volume_count=settings["logical_volume_count"],
+        allocator=allocator,
+        benchmark_config=benchmark_config
+    )
+
+    result: Dict[str, Any] = {
+        "region": region,
+        "vpc_info": vpc_info,
+        "keys": keys,
+        "device_names": device_names,
+        "device_assignments": [
+            f"{config['name']}={config['device_name']}" for config in volume_configs
+        ],
+        "volume_configs": volume_configs,
+        "golden_image_id": golden_image_id,
+        "planned_performance": benchmark.get_planned_performance(volume_configs),
+        "benchmark_results": None,
+        "instance": None,
+        "fleet": None,
+        "ebs_volumes": None,
+        "arrays": [],
+        "connection": None
+    }
+
+    if settings["deployment_mode"] == "fleet":
+        # Launch an Auto Scaling Group with the logical volume configuration
+        result["fleet"] = instance_fleet.launch_fleet(
+            vpc_info,
+            sec_group,
+            keys,
+            instance_type="t2.micro",
+            user_data=logical_volume_user_data,
+            block_device_configs=volume_configs,
+            image_id=golden_image_id,
+            min_size=settings["fleet_min_size"],
+            max_size=settings["fleet_max_size"],
+            desired_capacity=settings["fleet_desired_capacity"],
+            warm_pool_size=settings["fleet_warm_pool_size"],
+            instance_policies={"benchmark-publish-results": benchmark_policy} if benchmark_policy else None,
+            name_prefix=name_prefix,
+            opts=opts
+        )
+    else:
+        instance_profile = None
+        if benchmark_config is not None:
+            instance_profile = benchmark.create_benchmark_instance_profile(benchmark_config, name_prefix, opts)
+
+        # Launch EC2 instance with logical volume configuration
+        ec2_instance = instance.launch_instance(
+            vpc_info,
+            sec_group,
+            keys,
+            instance_type="t2.micro",
+            user_data=logical_volume_user_data,
+            block_device_configs=volume_configs if attach_at_launch else None,
+            image_id=golden_image_id,
+            instance_profile=instance_profile,
+            name_prefix=name_prefix,
+            opts=opts
+        )
+        result["instance"] = ec2_instance
+
+        if benchmark_config is not None and benchmark_config["publish"] == "tags":
+            result["benchmark_results"] = pulumi.Output.all(
+                ec2_instance.id,
+                benchmark.get_tagged_benchmark_results(ec2_instance.id, instance.get_invoke_options(opts))
+            ).apply(lambda args: {args[0]: {"jobs": args[1]}} if args[1] else {})
+
+        # Create EBS volumes and attach them to the instance
+        if not attach_at_launch:
+            result["ebs_volumes"] = ebs.create_ebs_volumes(
+                availability_zone=vpc_info["availability_zone"],
+                instance_id=ec2_instance.id,
+                volume_configs=volume_configs,
+                name_prefix=name_prefix,
+                opts=opts
+            )
+        result["connection"] = schema.build_connection_output(ec2_instance)
+
+    result["arrays"] = [schema.build_array_output(
+        "logical-volume",
+        "lvm",
+        raid_examples.LOGICAL_VOLUME_MOUNT_POINT,
+        raid_examples.LOGICAL_VOLUME_FILESYSTEM,
+        schema.build_volume_outputs(
+            volume_configs,
+            ebs_volumes=result["ebs_volumes"],
+            instance=result["instance"] if attach_at_launch else None
+        )
+    )]
+
+    # Results published by instances from earlier updates (fleet instances come and go)
+    if benchmark_config is not None and benchmark_config["publish"] == "ssm":
+        result["benchmark_results"] = benchmark.get_benchmark_results(benchmark_config, instance.get_invoke_options(opts))
+
+    return result
@@ -0,0 +1,110 @@
+from typing import Dict, Iterable, List, Optional
+
+# AWS-recommended device names for EBS data volumes on Linux instances.
+# /dev/sd[f-p] covers the common case; /dev/xvd[b-z][a-z] is used once
+# an instance needs more attachments than that range can hold.
+SD_SLOTS = [f"/dev/sd{letter}" for letter in "fghijklmnop"]
+XVD_SLOTS = [
+    f"/dev/xvd{first}{second}"
+    for first in "bcdefghijklmnopqrstuvwxyz"
+    for second in "abcdefghijklmnopqrstuvwxyz"
+]
+
+# Root device names used by the AMIs we launch
+DEFAULT_RESERVED = ["/dev/sda1", "/dev/xvda"]
+
+def canonical_device_name(device_name: str) -> str:
+    """
+    Normalise a device name so /dev/sdX and /dev/xvdX compare as the same slot.
+
+    Args:
+        device_name: Device name as passed to AWS (e.g. /dev/sdf or /dev/xvdf)
+
+    Returns:
+        Device name using the /dev/sd prefix
+    """
+    if device_name.startswith("/dev/xvd"):
+        return "/dev/sd" + device_name[len("/dev/xvd"):]
+    return device_name
+
+class DeviceSlotAllocator:
+    """
+    Hands out attachment device names for a single instance.
+
+    Names are keyed by volume name, so asking again for the same volume
+    returns the same device. Free slots are handed out in a fixed order
+    (sd[f-p] first, then xvd[b-z][a-z]), which keeps existing volumes on
+    their devices when an array is grown or shrunk from the end.
+    """
+
+    def __init__(self, reserved: Optional[Iterable[str]] = None, existing: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            reserved: Device names already used by the AMI or other attachments
+            existing: Previously assigned volume name -> device name mapping to keep
+        """
+        self._slots = SD_SLOTS + XVD_SLOTS
+        self._reserved = {canonical_device_name(name) for name in DEFAULT_RESERVED}
+        self._assigned: Dict[str, str] = {}
+        self._used = set()
+
+        for device_name in reserved or []:
+            self.reserve(device_name)
+        for key, device_name in (existing or {}).items():
+            self._claim(key, device_name)
+
+    def reserve(self, device_name: str) -> None:
+        """Mark a device name as unavailable for allocation."""
+        canonical = canonical_device_name(device_name)
+        if canonical in self._used:
+            raise ValueError(f"Device {device_name} is already assigned and cannot be reserved")
+        self._reserved.add(canonical)
+
+    def is_free(self, device_name: str) -> bool:
+        """Return True if the device name is neither reserved nor assigned."""
+        canonical = canonical_device_name(device_name)
+        return canonical not in self._reserved and canonical not in self._used
+
+    def allocate(self, key: str, preferred: Optional[str] = None) -> str:
+        """
+        Return the device name for a volume, assigning one if needed.
+
+        Args:
+            key: Stable identifier for the volume (usually its resource name)
+            preferred: Device name to use if it is still free
+
+        Returns:
+            Device name assigned to the volume
+        """
+        if key in self._assigned:
+            return self._assigned[key]
+
+        if preferred and self.is_free(preferred):
+            return self._claim(key, preferred)
+
+        for device_name in self._slots:
+            if self.is_free(device_name):
+                return self._claim(key, device_name)
+
+        raise ValueError(f"No free device slots left for volume {key}")
+
+    def allocate_many(self, keys: Iterable[str]) -> List[str]:
+        """Allocate device names for several volumes, in order."""
+        return [self.allocate(key) for key in keys]
+
+    def release(self, key: str) -> None:
+        """Free the device name held by a volume, if any."""
+        device_name = self._assigned.pop(key, None)
+        if device_name:
+            self._used.discard(canonical_device_name(device_name))
+
+    def assignments(self) -> Dict[str, str]:
+        """Return a copy of the volume name -> device name mapping."""
+        return dict(self._assigned)
+
+    def _claim(self, key: str, device_name: str) -> str:
+        if not self.is_free(device_name):
+            raise ValueError(f"Device {device_name} is already in use on this instance")
+        self._assigned[key] = device_name
+        self._used.add(canonical_device_name(device_name))
+        return device_name
@@ -1,8 +1,10 @@
 import pulumi_aws as aws
 import pulumi
+import timing.phases as timing
 from typing import Dict, Any, Optional, List
 
-def create_ebs_volumes(availability_zone: str, instance_id: Optional[str] = None, volume_configs: Optional[List[Dict[str, Any]]] = None):
+@timing.traced()
+def create_ebs_volumes(availability_zone: str, instance_id: Optional[str] = None, volume_configs: Optional[List[Dict[str, Any]]] = None, name_prefix: str = "", opts: Optional[pulumi.ResourceOptions] = None):
     """
     Create EBS volumes and optionally attach them to an EC2 instance.
     
@@ -10,6 +12,8 @@ def create_ebs_volumes(availability_zone: str, instance_id: Optional[str] = None
         availability_zone: The AZ where volumes will be created
         instance_id: Optional EC2 instance ID to attach volumes to
         volume_configs: List of volume configurations
+        name_prefix: Prefix for resource names (e.g. the region when deploying several)
+        opts: Resource options, e.g. an explicit regional provider
     
     Returns:
         Dictionary containing created volumes and attachments
@@ -42,22 +46,26 @@ def create_ebs_volumes(availability_zone: str, instance_id: Optional[str] = None
     # Create EBS volumes
     for config in volume_configs:
         volume = aws.ebs.Volume(
-            config["name"],
+            f"{name_prefix}{config['name']}",
             availability_zone=availability_zone,
             size=config["size"],
             type=config["type"],
+            iops=config.get("iops"),
+            throughput=config.get("throughput"),
             encrypted=config.get("encrypted", False),
-            tags=config.get("tags", {})
+            tags=config.get("tags", {}),
+            opts=opts
         )
         volumes[config["name"]] = volume
         
         # Attach volume to instance if instance_id is provided
         if instance_id:
             attachment = aws.ec2.VolumeAttachment(
-                f"{config['name']}-attachment",
+                f"{name_prefix}{config['name']}-attachment",
                 device_name=config["device_name"],
                 volume_id=volume.id,
-                instance_id=instance_id
+                instance_id=instance_id,
+                opts=opts
             )
             attachments[f"{config['name']}-attachment"] = attachment
     
@@ -66,6 +74,35 @@ def create_ebs_volumes(availability_zone: str, instance_id: Optional[str] = None
         "attachments": attachments
     }
 
+def get_block_device_mapping(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a volume configuration into a launch-time block device mapping.
+    
+    Uses the same size, type, IOPS and throughput settings as create_ebs_volumes,
+    so a volume config can either be hot-attached or mapped at launch.
+    
+    Args:
+        config: Volume configuration (see create_ebs_volumes)
+    
+    Returns:
+        Dictionary usable as an entry of an instance's ebs_block_devices
+    """
+    mapping: Dict[str, Any] = {
+        "device_name": config["device_name"],
+        "volume_size": config["size"],
+        "volume_type": config["type"],
+        "encrypted": config.get("encrypted", False),
+        # Launch-time volumes share the instance lifecycle unless told otherwise
+        "delete_on_termination": config.get("delete_on_termination", True),
+        "tags": config.get("tags", {})
+    }
+    if config.get("iops") is not None:
+        mapping["iops"] = config["iops"]
+    if config.get("throughput") is not None:
+        mapping["throughput"] = config["throughput"]
+    
+    return mapping
+
 def create_ebs_volume_with_snapshot(snapshot_id: str, availability_zone: str, instance_id: Optional[str] = None, device_name: str = "/dev/sdf"):
     """
     Create an EBS volume from a snapshot and optionally attach it.
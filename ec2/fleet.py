@@ -0,0 +1,252 @@
+import base64
+import json
+import pulumi_aws as aws
+import pulumi
+import ebs.volumes as ebs
+import ec2.instance as instance
+import timing.phases as timing
+from typing import Dict, Any, List, Optional
+
+# Lifecycle hook that holds new instances until their storage bootstrap is done
+BOOTSTRAP_HOOK_NAME = "storage-bootstrap"
+BOOTSTRAP_MARKER = "/var/lib/storage-bootstrap/done"
+BOOTSTRAP_COMPLETE_SCRIPT = "/var/lib/cloud/scripts/per-boot/complete-storage-bootstrap.sh"
+
+def create_lifecycle_completion_user_data() -> str:
+    """
+    Generate the user data section that releases the storage-bootstrap lifecycle hook.
+
+    Appended after the storage setup script: it marks the bootstrap as done and
+    completes the hook for this launch. The same script is installed as a
+    cloud-init per-boot script, so a warm pool instance that is started again
+    completes the hook as soon as it boots instead of waiting for the timeout.
+
+    Returns:
+        User data script section as string
+    """
+    return f"""
+# Release the Auto Scaling lifecycle hook now that storage is ready
+mkdir -p $(dirname {BOOTSTRAP_MARKER}) $(dirname {BOOTSTRAP_COMPLETE_SCRIPT})
+cat > {BOOTSTRAP_COMPLETE_SCRIPT} <<'HOOK'
+#!/bin/bash
+# Only complete the hook once the first-boot storage setup has finished
+[ -f {BOOTSTRAP_MARKER} ] || exit 0
+TOKEN=$(curl -s -X PUT "http://169.254.169.254/latest/api/token" -H "X-aws-ec2-metadata-token-ttl-seconds: 300")
+metadata() {{
+    curl -s -H "X-aws-ec2-metadata-token: $TOKEN" "http://169.254.169.254/latest/meta-data/$1"
+}}
+INSTANCE_ID=$(metadata instance-id)
+REGION=$(metadata placement/region)
+GROUP_NAME=$(metadata tags/instance/aws:autoscaling:groupName)
+aws autoscaling complete-lifecycle-action \\
+    --region "$REGION" \\
+    --auto-scaling-group-name "$GROUP_NAME" \\
+    --lifecycle-hook-name {BOOTSTRAP_HOOK_NAME} \\
+    --instance-id "$INSTANCE_ID" \\
+    --lifecycle-action-result CONTINUE || true
+HOOK
+chmod 755 {BOOTSTRAP_COMPLETE_SCRIPT}
+touch {BOOTSTRAP_MARKER}
+{BOOTSTRAP_COMPLETE_SCRIPT}
+"""
+
+def create_fleet_instance_profile(name_prefix: str = "", opts: Optional[pulumi.ResourceOptions] = None, policies: Optional[Dict[str, str]] = None):
+    """
+    Create the IAM role and instance profile that let fleet instances complete their lifecycle hook.
+
+    Args:
+        name_prefix: Prefix for resource names (e.g. the region when deploying several)
+        opts: Resource options, e.g. an explicit regional provider
+        policies: Extra inline policies for the role, keyed by name (e.g. publishing benchmark results)
+
+    Returns:
+        Instance profile resource
+    """
+    role = aws.iam.Role(f"{name_prefix}fleet-instance-role",
+        assume_role_policy=json.dumps({
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Effect": "Allow",
+                "Principal": {"Service": "ec2.amazonaws.com"},
+                "Action": "sts:AssumeRole"
+            }]
+        }),
+        tags={"ManagedBy": "pulumi"},
+        opts=opts
+    )
+
+    aws.iam.RolePolicy(f"{name_prefix}fleet-complete-lifecycle-action",
+        role=role.id,
+        policy=json.dumps({
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Effect": "Allow",
+                "Action": "autoscaling:CompleteLifecycleAction",
+                "Resource": "*",
+                # Only groups created by this program (they carry the ManagedBy tag)
+                "Condition": {
+                    "StringEquals": {"autoscaling:ResourceTag/ManagedBy": "pulumi"}
+                }
+            }]
+        }),
+        opts=opts
+    )
+
+    for policy_name, policy in (policies or {}).items():
+        aws.iam.RolePolicy(f"{name_prefix}fleet-{policy_name}", role=role.id, policy=policy, opts=opts)
+
+    return aws.iam.InstanceProfile(f"{name_prefix}fleet-instance-profile", role=role.name, opts=opts)
+
+def create_launch_template(sec_group, keys, ami="amzn2-ami-hvm-*-x86_64-gp2", instance_type="t2.micro", user_data: Optional[str] = None, block_device_configs: Optional[List[Dict[str, Any]]] = None, image_id: Optional[pulumi.Input[str]] = None, prefer_baked_image: bool = True, instance_profile=None, name_prefix: str = "", opts: Optional[pulumi.ResourceOptions] = None):
+    """
+    Create a launch template from the same arguments launch_instance uses.
+
+    Args:
+        sec_group: Security group
+        keys: Key pair information
+        ami: AMI pattern to use
+        instance_type: EC2 instance type
+        user_data: Optional user data script (for RAID setup)
+        block_device_configs: Optional volume configurations to map at launch
+        image_id: Explicit AMI ID (e.g. an image baked in this update), overrides the lookup
+        prefer_baked_image: Prefer the stack's newest baked image over the AMI pattern
+        instance_profile: Optional IAM instance profile for the instances
+        name_prefix: Prefix for resource names (e.g. the region when deploying several)
+        opts: Resource options, e.g. an explicit regional provider
+
+    Returns:
+        Launch template resource
+    """
+    # Baked images keep their parent's root device name, so the lookup is still
+    # used for the root mapping when an explicit image ID is given
+    ami = instance.resolve_ami(ami, prefer_baked_image, instance.get_invoke_options(opts))
+
+    # Root volume plus any data volumes, all created with the instance
+    block_device_mappings = [{
+        "device_name": ami.root_device_name,
+        "ebs": dict(instance.ROOT_BLOCK_DEVICE),
+    }]
+    for config in block_device_configs or []:
+        mapping = ebs.get_block_device_mapping(config)
+        device_name = mapping.pop("device_name")
+        # Launch template EBS mappings don't take tags; volumes are tagged below
+        mapping.pop("tags")
+        block_device_mappings.append({"device_name": device_name, "ebs": mapping})
+
+    template_args = {
+        "image_id": image_id if image_id is not None else ami.id,
+        "instance_type": instance_type,
+        "key_name": keys["keypair"].key_name,
+        "vpc_security_group_ids": [sec_group.id],
+        "block_device_mappings": block_device_mappings,
+        "tag_specifications": [
+            {"resource_type": "instance", "tags": {"Name": "Pulumi-EC2"}},
+            {"resource_type": "volume", "tags": {"Name": "Pulumi-EC2", "ManagedBy": "pulumi"}},
+        ],
+        # IMDSv2 with instance tags, so boot scripts can read their Auto Scaling Group name
+        "metadata_options": {
+            "http_endpoint": "enabled",
+            "http_tokens": "required",
+            "instance_metadata_tags": "enabled",
+        },
+    }
+
+    if instance_profile is not None:
+        template_args["iam_instance_profile"] = {"arn": instance_profile.arn}
+
+    # Launch templates take user data base64-encoded
+    if user_data:
+        template_args["user_data"] = base64.b64encode(user_data.encode("utf-8")).decode("ascii")
+
+    return aws.ec2.LaunchTemplate(f"{name_prefix}{instance_type}-launch-template", **template_args, opts=opts)
+
+@timing.traced()
+def launch_fleet(vpc_info, sec_group, keys, ami="amzn2-ami-hvm-*-x86_64-gp2", instance_type="t2.micro", user_data: Optional[str] = None, block_device_configs: Optional[List[Dict[str, Any]]] = None, image_id: Optional[pulumi.Input[str]] = None, prefer_baked_image: bool = True, min_size: int = 1, max_size: int = 3, desired_capacity: Optional[int] = None, warm_pool_size: int = 0, bootstrap_timeout: int = 300, instance_policies: Optional[Dict[str, str]] = None, name_prefix: str = "", opts: Optional[pulumi.ResourceOptions] = None):
+    """
+    Launch an Auto Scaling Group of instances spread over the VPC's public subnets.
+
+    Args:
+        vpc_info: VPC information dictionary
+        sec_group: Security group
+        keys: Key pair information
+        ami: AMI pattern to use
+        instance_type: EC2 instance type
+        user_data: Optional user data script (for RAID setup)
+        block_device_configs: Optional volume configurations to map at launch
+        image_id: Explicit AMI ID (e.g. an image baked in this update), overrides the lookup
+        prefer_baked_image: Prefer the stack's newest baked image over the AMI pattern
+        min_size: Minimum number of in-service instances
+        max_size: Maximum number of in-service instances
+        desired_capacity: Desired number of in-service instances (defaults to min_size)
+        warm_pool_size: Number of pre-initialized stopped instances to keep (0 disables the warm pool)
+        bootstrap_timeout: Upper bound in seconds a new instance is held in Pending while
+            user data builds storage; instances release the hook themselves once done,
+            and ones that haven't by then are terminated and replaced
+        instance_policies: Extra inline IAM policies for the instances, keyed by name
+        name_prefix: Prefix for resource names (e.g. the region when deploying several)
+        opts: Resource options, e.g. an explicit regional provider
+
+    Returns:
+        Dictionary containing the launch template and Auto Scaling Group
+    """
+    # Instances release the storage-bootstrap hook themselves when their user data finishes
+    instance_profile = None
+    if user_data:
+        instance_profile = create_fleet_instance_profile(name_prefix, opts, policies=instance_policies)
+        user_data = user_data + create_lifecycle_completion_user_data()
+
+    launch_template = create_launch_template(
+        sec_group,
+        keys,
+        ami=ami,
+        instance_type=instance_type,
+        user_data=user_data,
+        block_device_configs=block_device_configs,
+        image_id=image_id,
+        prefer_baked_image=prefer_baked_image,
+        instance_profile=instance_profile,
+        name_prefix=name_prefix,
+        opts=opts
+    )
+
+    group_args = {
+        "min_size": min_size,
+        "max_size": max_size,
+        "desired_capacity": desired_capacity if desired_capacity is not None else min_size,
+        "vpc_zone_identifiers": vpc_info.get("public_subnet_ids", [vpc_info["public_subnet_id"]]),
+        "launch_template": {
+            "id": launch_template.id,
+            "version": launch_template.latest_version.apply(str),
+        },
+        "tags": [
+            {"key": "Name", "value": "Pulumi-EC2", "propagate_at_launch": True},
+            {"key": "ManagedBy", "value": "pulumi", "propagate_at_launch": True},
+        ],
+    }
+
+    # Hold new instances until the storage bootstrap in user data has finished.
+    # Only a successful bootstrap completes the hook; if it fails (set -e) the hook
+    # times out and the instance is abandoned and replaced rather than served
+    if user_data:
+        group_args["initial_lifecycle_hooks"] = [{
+            "name": BOOTSTRAP_HOOK_NAME,
+            "lifecycle_transition": "autoscaling:EC2_INSTANCE_LAUNCHING",
+            "default_result": "ABANDON",
+            "heartbeat_timeout": bootstrap_timeout,
+        }]
+
+    # Warm pool instances run user data once, then stop with their volumes built
+    if warm_pool_size > 0:
+        group_args["warm_pool"] = {
+            "pool_state": "Stopped",
+            "min_size": warm_pool_size,
+            "max_group_prepared_capacity": max_size + warm_pool_size,
+            "instance_reuse_policy": {"reuse_on_scale_in": True},
+        }
+
+    auto_scaling_group = aws.autoscaling.Group(f"{name_prefix}{instance_type}-fleet", **group_args, opts=opts)
+
+    return {
+        "launch_template": launch_template,
+        "auto_scaling_group": auto_scaling_group
+    }
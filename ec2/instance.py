@@ -1,8 +1,94 @@
 import pulumi_aws as aws
 import pulumi
-from typing import Dict, Any, Optional
+import ebs.volumes as ebs
+import timing.phases as timing
+from typing import Dict, Any, List, Optional
 
-def launch_instance(vpc_info, sec_group, keys, ami="amzn2-ami-hvm-*-x86_64-gp2", instance_type="t2.micro", user_data: Optional[str] = None):
+# Root volume shared by single instances and fleet launch templates
+ROOT_BLOCK_DEVICE = {
+    "volume_size": 8,
+    "volume_type": "gp3",
+    "delete_on_termination": True,
+    "encrypted": True,
+}
+
+def get_invoke_options(opts: Optional[pulumi.ResourceOptions] = None) -> Optional[pulumi.InvokeOptions]:
+    """Build invoke options that use the same provider as the given resource options."""
+    if opts is None or opts.provider is None:
+        return None
+    return pulumi.InvokeOptions(provider=opts.provider)
+
+def lookup_ami(ami: str = "amzn2-ami-hvm-*-x86_64-gp2", opts: Optional[pulumi.InvokeOptions] = None):
+    """
+    Look up the most recent Amazon-owned HVM AMI matching a name pattern.
+    
+    Args:
+        ami: AMI name pattern
+        opts: Invoke options, e.g. an explicit regional provider
+    
+    Returns:
+        AMI lookup result
+    """
+    return aws.ec2.get_ami(
+        most_recent=True,
+        owners=["amazon"],
+        filters=[
+            {"name": "name", "values": [f"{ ami }"]},
+            {"name": "virtualization-type", "values": ["hvm"]},
+        ],
+        opts=opts
+    )
+
+# Tag identifying golden images baked by image.bake for a stack
+BAKED_IMAGE_ROLE = "storage-golden-image"
+
+def find_baked_ami(opts: Optional[pulumi.InvokeOptions] = None) -> Optional[str]:
+    """
+    Find the newest golden image baked for the current stack.
+    
+    Args:
+        opts: Invoke options, e.g. an explicit regional provider
+    
+    Returns:
+        AMI ID, or None if no image has been baked yet
+    """
+    result = aws.ec2.get_ami_ids(
+        owners=["self"],
+        filters=[
+            {"name": "tag:Stack", "values": [pulumi.get_stack()]},
+            {"name": "tag:Role", "values": [BAKED_IMAGE_ROLE]},
+        ],
+        opts=opts
+    )
+    # Results are sorted newest first
+    return result.ids[0] if result.ids else None
+
+@timing.traced()
+def resolve_ami(ami: str = "amzn2-ami-hvm-*-x86_64-gp2", prefer_baked_image: bool = True, opts: Optional[pulumi.InvokeOptions] = None):
+    """
+    Pick the AMI to launch: the stack's newest baked image if there is one,
+    otherwise the newest Amazon AMI matching the name pattern.
+    
+    Args:
+        ami: AMI name pattern to fall back to
+        prefer_baked_image: Look for a baked golden image first
+        opts: Invoke options, e.g. an explicit regional provider
+    
+    Returns:
+        AMI lookup result
+    """
+    if prefer_baked_image:
+        baked_ami_id = find_baked_ami(opts)
+        if baked_ami_id:
+            return aws.ec2.get_ami(
+                owners=["self"],
+                filters=[{"name": "image-id", "values": [baked_ami_id]}],
+                opts=opts
+            )
+    return lookup_ami(ami, opts)
+
+@timing.traced()
+def launch_instance(vpc_info, sec_group, keys, ami="amzn2-ami-hvm-*-x86_64-gp2", instance_type="t2.micro", user_data: Optional[str] = None, block_device_configs: Optional[List[Dict[str, Any]]] = None, image_id: Optional[pulumi.Input[str]] = None, prefer_baked_image: bool = True, instance_profile=None, name_prefix: str = "", opts: Optional[pulumi.ResourceOptions] = None):
     """
     Launch an EC2 instance with optional user data for RAID configuration.
     
@@ -13,37 +99,42 @@ def launch_instance(vpc_info, sec_group, keys, ami="amzn2-ami-hvm-*-x86_64-gp2",
         ami: AMI pattern to use
         instance_type: EC2 instance type
         user_data: Optional user data script (for RAID setup)
+        block_device_configs: Optional volume configurations to attach at launch
+            instead of hot-attaching them with ebs.create_ebs_volumes
+        image_id: Explicit AMI ID (e.g. an image baked in this update), overrides the lookup
+        prefer_baked_image: Prefer the stack's newest baked image over the AMI pattern
+        instance_profile: Optional IAM instance profile for the instance
+        name_prefix: Prefix for resource names (e.g. the region when deploying several)
+        opts: Resource options, e.g. an explicit regional provider
     
     Returns:
         EC2 instance resource
     """
-    ami = aws.ec2.get_ami(
-        most_recent=True,
-        owners=["amazon"],
-        filters=[
-            {"name": "name", "values": [f"{ ami }"]},
-            {"name": "virtualization-type", "values": ["hvm"]},
-        ]
-    )
+    if image_id is None:
+        image_id = resolve_ami(ami, prefer_baked_image, get_invoke_options(opts)).id
 
     instance_args = {
         "instance_type": instance_type,
         "vpc_security_group_ids": [sec_group.id],
-        "ami": ami.id,
+        "ami": image_id,
         "key_name": keys["keypair"].key_name,
         "subnet_id": vpc_info["public_subnet_id"],
         "tags": {"Name": "Pulumi-EC2"},
         # Root volume configuration
-        "root_block_device": {
-            "volume_size": 8,
-            "volume_type": "gp3",
-            "delete_on_termination": True,
-            "encrypted": True,
-        }
+        "root_block_device": dict(ROOT_BLOCK_DEVICE)
     }
     
+    # Map data volumes at launch so they exist before user data runs
+    if block_device_configs:
+        instance_args["ebs_block_devices"] = [
+            ebs.get_block_device_mapping(config) for config in block_device_configs
+        ]
+    
+    if instance_profile is not None:
+        instance_args["iam_instance_profile"] = instance_profile.name
+
     # Add user data if provided (for RAID setup)
     if user_data:
         instance_args["user_data"] = user_data
 
-    return aws.ec2.Instance(f"{instance_type}-instance", **instance_args)
+    return aws.ec2.Instance(f"{name_prefix}{instance_type}-instance", **instance_args, opts=opts)
@@ -0,0 +1 @@
+# Image module for baking golden AMIs 
\ No newline at end of file
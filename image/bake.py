@@ -0,0 +1,200 @@
+import json
+import pulumi_aws as aws
+import pulumi
+import ec2.instance as instance
+import timing.phases as timing
+from typing import Dict, Any, List, Optional
+
+# Packages baked into the image so boot scripts no longer install them
+STORAGE_PACKAGES = ["mdadm", "lvm2", "xfsprogs", "fio", "amazon-cloudwatch-agent"]
+
+# Kernel settings for hosts serving data from RAID/LVM arrays
+STORAGE_SYSCTLS = {
+    "vm.swappiness": "10",
+    "vm.dirty_background_ratio": "5",
+    "vm.dirty_ratio": "10",
+    "vm.vfs_cache_pressure": "50",
+}
+
+def create_storage_component_document(packages: Optional[List[str]] = None, sysctls: Optional[Dict[str, str]] = None) -> str:
+    """
+    Generate the Image Builder component document that installs the storage tooling.
+
+    Args:
+        packages: Packages to install (defaults to STORAGE_PACKAGES)
+        sysctls: Kernel settings to persist (defaults to STORAGE_SYSCTLS)
+
+    Returns:
+        Component document as string
+    """
+    packages = packages or STORAGE_PACKAGES
+    sysctls = sysctls or STORAGE_SYSCTLS
+
+    sysctl_conf = "\n".join(f"{key} = {value}" for key, value in sysctls.items())
+
+    # Image Builder accepts JSON as a YAML document
+    document = {
+        "name": "storage-tooling",
+        "description": "Storage tooling, monitoring agent and sysctls for RAID/LVM hosts",
+        "schemaVersion": 1.0,
+        "phases": [
+            {
+                "name": "build",
+                "steps": [
+                    {
+                        "name": "InstallStorageTooling",
+                        "action": "ExecuteBash",
+                        "inputs": {
+                            "commands": [f"yum install -y {' '.join(packages)}"]
+                        }
+                    },
+                    {
+                        "name": "WriteSysctls",
+                        "action": "CreateFile",
+                        "inputs": [{
+                            "path": "/etc/sysctl.d/90-storage.conf",
+                            "content": sysctl_conf + "\n",
+                            "overwrite": True
+                        }]
+                    }
+                ]
+            },
+            {
+                "name": "validate",
+                "steps": [
+                    {
+                        "name": "CheckStorageTooling",
+                        "action": "ExecuteBash",
+                        "inputs": {
+                            "commands": ["command -v mdadm", "command -v pvcreate", "sysctl --system"]
+                        }
+                    }
+                ]
+            }
+        ]
+    }
+
+    return json.dumps(document, indent=2)
+
+def create_image_builder_instance_profile(name_prefix: str = "", opts: Optional[pulumi.ResourceOptions] = None):
+    """
+    Create the IAM role and instance profile used by Image Builder build instances.
+
+    Args:
+        name_prefix: Prefix for resource names (e.g. the region when deploying several)
+        opts: Resource options, e.g. an explicit regional provider
+
+    Returns:
+        Instance profile resource
+    """
+    role = aws.iam.Role(f"{name_prefix}image-builder-role",
+        assume_role_policy=json.dumps({
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Effect": "Allow",
+                "Principal": {"Service": "ec2.amazonaws.com"},
+                "Action": "sts:AssumeRole"
+            }]
+        }),
+        tags={"ManagedBy": "pulumi"},
+        opts=opts
+    )
+
+    for policy_name in ["AmazonSSMManagedInstanceCore", "EC2InstanceProfileForImageBuilder"]:
+        aws.iam.RolePolicyAttachment(f"{name_prefix}image-builder-{policy_name}",
+            role=role.name,
+            policy_arn=f"arn:aws:iam::aws:policy/{policy_name}",
+            opts=opts
+        )
+
+    return aws.iam.InstanceProfile(f"{name_prefix}image-builder-instance-profile", role=role.name, opts=opts)
+
+@timing.traced()
+def create_golden_image(vpc_info, sec_group, ami="amzn2-ami-hvm-*-x86_64-gp2", instance_types: Optional[List[str]] = None, version: str = "1.0.0", name_prefix: str = "", opts: Optional[pulumi.ResourceOptions] = None):
+    """
+    Bake a golden AMI with the storage tooling pre-installed using EC2 Image Builder.
+
+    The image is tagged with the stack name, so launch_instance and the fleet
+    launch template pick it up over the generic AMI pattern on later updates.
+
+    Args:
+        vpc_info: VPC information dictionary
+        sec_group: Security group (must allow outbound access for package installs)
+        ami: AMI pattern for the parent image
+        instance_types: Instance types for the build instance
+        version: Semantic version of the component and recipe (bump to rebake)
+        name_prefix: Prefix for resource names (e.g. the region when deploying several)
+        opts: Resource options, e.g. an explicit regional provider
+
+    Returns:
+        Dictionary containing the Image Builder resources and the baked AMI ID
+    """
+    stack = pulumi.get_stack()
+    invoke_opts = instance.get_invoke_options(opts)
+    parent_image = instance.lookup_ami(ami, invoke_opts)
+
+    component = aws.imagebuilder.Component(f"{name_prefix}storage-tooling-component",
+        name=f"storage-tooling-{stack}",
+        platform="Linux",
+        version=version,
+        data=create_storage_component_document(),
+        tags={"ManagedBy": "pulumi"},
+        opts=opts
+    )
+
+    recipe = aws.imagebuilder.ImageRecipe(f"{name_prefix}storage-golden-recipe",
+        name=f"storage-golden-{stack}",
+        parent_image=parent_image.id,
+        version=version,
+        components=[{"component_arn": component.arn}],
+        tags={"ManagedBy": "pulumi"},
+        opts=opts
+    )
+
+    instance_profile = create_image_builder_instance_profile(name_prefix, opts)
+
+    infrastructure = aws.imagebuilder.InfrastructureConfiguration(f"{name_prefix}storage-golden-infrastructure",
+        name=f"storage-golden-{stack}",
+        instance_profile_name=instance_profile.name,
+        instance_types=instance_types or ["t3.small"],
+        subnet_id=vpc_info["public_subnet_id"],
+        security_group_ids=[sec_group.id],
+        terminate_instance_on_failure=True,
+        tags={"ManagedBy": "pulumi"},
+        opts=opts
+    )
+
+    distribution = aws.imagebuilder.DistributionConfiguration(f"{name_prefix}storage-golden-distribution",
+        name=f"storage-golden-{stack}",
+        distributions=[{
+            "region": aws.get_region(opts=invoke_opts).name,
+            "ami_distribution_configuration": {
+                "name": f"storage-golden-{stack}-{{{{ imagebuilder:buildDate }}}}",
+                "ami_tags": {
+                    "Name": f"storage-golden-{stack}",
+                    "Stack": stack,
+                    "Role": instance.BAKED_IMAGE_ROLE,
+                    "ManagedBy": "pulumi"
+                }
+            }
+        }],
+        opts=opts
+    )
+
+    # Pulumi waits for the build to finish before the image resource is created
+    image = aws.imagebuilder.Image(f"{name_prefix}storage-golden-image",
+        image_recipe_arn=recipe.arn,
+        infrastructure_configuration_arn=infrastructure.arn,
+        distribution_configuration_arn=distribution.arn,
+        tags={"ManagedBy": "pulumi"},
+        opts=opts
+    )
+
+    return {
+        "component": component,
+        "recipe": recipe,
+        "infrastructure": infrastructure,
+        "distribution": distribution,
+        "image": image,
+        "ami_id": image.output_resources.apply(lambda resources: resources[0].amis[0].image)
+    }
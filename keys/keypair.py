@@ -1,18 +1,37 @@
+import os
 import subprocess
 import pulumi_aws as aws
+import pulumi
+import timing.phases as timing
+from typing import Dict, Optional, Tuple
 
 PRIVATE_KEY_PATH = "./ec2_key"
 PUBLIC_KEY_PATH = PRIVATE_KEY_PATH + ".pub"
 
-def generate_keypair():
-    subprocess.run(["ssh-keygen", "-t", "rsa", "-b", "2048", "-f", PRIVATE_KEY_PATH, "-N", ""])
-    
-    with open(PRIVATE_KEY_PATH, "r") as f:
-        private_key = f.read()
-    with open(PUBLIC_KEY_PATH, "r") as f:
-        public_key = f.read()
+# Key material loaded by this program run, shared by every region
+_key_material: Dict[str, Tuple[str, str]] = {}
 
-    keypair = aws.ec2.KeyPair("ec2-keypair", public_key=public_key)
+@timing.traced()
+def generate_key_material(private_key_path: str = PRIVATE_KEY_PATH):
+    if private_key_path not in _key_material:
+        # Reuse an existing key instead of letting ssh-keygen prompt to overwrite it
+        if not os.path.exists(private_key_path):
+            subprocess.run(["ssh-keygen", "-t", "rsa", "-b", "2048", "-f", private_key_path, "-N", ""])
+
+        with open(private_key_path, "r") as f:
+            private_key = f.read()
+        with open(private_key_path + ".pub", "r") as f:
+            public_key = f.read()
+
+        _key_material[private_key_path] = (private_key, public_key)
+
+    return _key_material[private_key_path]
+
+@timing.traced()
+def generate_keypair(name_prefix: str = "", opts: Optional[pulumi.ResourceOptions] = None, private_key_path: str = PRIVATE_KEY_PATH):
+    private_key, public_key = generate_key_material(private_key_path)
+
+    keypair = aws.ec2.KeyPair(f"{name_prefix}ec2-keypair", public_key=public_key, opts=opts)
 
     return {
         "keypair": keypair,
@@ -1,11 +1,54 @@
 import pulumi
 
-def export_outputs(instance, keys, ebs_volumes=None):
+def export_outputs(instance, keys):
     pulumi.export("public_ip", instance.public_ip)
     pulumi.export("public_dns", instance.public_dns)
     pulumi.export("ssh_private_key", pulumi.Output.secret(keys["private_key"]))
     pulumi.export("ssh_user", pulumi.Output.secret(keys["ssh_user"]))
-    
-    # Export EBS volumes information if provided
-    if ebs_volumes:
-        ebs_volumes.apply(lambda volumes: pulumi.export("ebs_volumes", volumes))
+
+def export_storage_outputs(arrays, connection=None):
+    """
+    Export the compact storage schema (see output.schema) at the top level.
+
+    Args:
+        arrays: Array outputs from schema.build_array_output
+        connection: Connection output from schema.build_connection_output (instance mode)
+    """
+    pulumi.export("arrays", {array["name"]: array for array in arrays})
+    if connection is not None:
+        pulumi.export("connection", connection)
+
+def export_fleet_outputs(fleet, keys):
+    pulumi.export("auto_scaling_group_name", fleet["auto_scaling_group"].name)
+    pulumi.export("launch_template_id", fleet["launch_template"].id)
+    pulumi.export("ssh_private_key", pulumi.Output.secret(keys["private_key"]))
+    pulumi.export("ssh_user", pulumi.Output.secret(keys["ssh_user"]))
+
+def export_region_outputs(deployments):
+    regions = {}
+    for deployment in deployments:
+        region_outputs = {
+            "availability_zones": deployment["vpc_info"]["availability_zones"],
+            "vpc_id": deployment["vpc_info"]["vpc_id"],
+        }
+        if deployment["golden_image_id"] is not None:
+            region_outputs["golden_image_id"] = deployment["golden_image_id"]
+        if deployment["benchmark_results"] is not None:
+            region_outputs["logical_volume_benchmark"] = deployment["benchmark_results"]
+        region_outputs["arrays"] = {array["name"]: array for array in deployment["arrays"]}
+        if deployment["connection"] is not None:
+            region_outputs["connection"] = deployment["connection"]
+        if deployment["fleet"] is not None:
+            region_outputs["auto_scaling_group_name"] = deployment["fleet"]["auto_scaling_group"].name
+            region_outputs["launch_template_id"] = deployment["fleet"]["launch_template"].id
+        else:
+            region_outputs["public_ip"] = deployment["instance"].public_ip
+            region_outputs["public_dns"] = deployment["instance"].public_dns
+        regions[deployment["region"]] = region_outputs
+
+    pulumi.export("regions", regions)
+
+    # Every region imports the same key material
+    keys = deployments[0]["keys"]
+    pulumi.export("ssh_private_key", pulumi.Output.secret(keys["private_key"]))
+    pulumi.export("ssh_user", pulumi.Output.secret(keys["ssh_user"]))
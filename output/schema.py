@@ -0,0 +1,135 @@
+"""
+Stack Output Schema
+
+Compact, typed stack outputs for the storage arrays and the instance
+connection details. Only plain IDs, names and numbers are exported (never
+whole resources), so the checkpoint stays small and downstream stacks can
+read them with a StackReference.
+
+Top-level outputs:
+    arrays: array name -> ArrayOutput
+    connection: ConnectionOutput (instance mode only)
+"""
+
+import pulumi
+from typing import Dict, Any, List, Optional, TypedDict
+
+class VolumeOutput(TypedDict):
+    name: str
+    device_name: str
+    # None until known, and for fleets (every instance has its own volumes)
+    volume_id: Optional[str]
+    size: int
+    type: str
+    # Provisioned values; None means the volume type's baseline
+    iops: Optional[int]
+    throughput: Optional[int]
+
+class ArrayOutput(TypedDict):
+    name: str
+    layout: str
+    mount_point: str
+    filesystem: str
+    volumes: List[VolumeOutput]
+
+class ConnectionOutput(TypedDict):
+    instance_id: str
+    public_ip: str
+    public_dns: str
+    ssh_port: int
+
+def build_volume_outputs(volume_configs: List[Dict[str, Any]], ebs_volumes: Optional[Dict[str, Any]] = None, instance=None) -> List[VolumeOutput]:
+    """
+    Describe an array's volumes by their IDs, devices and provisioned performance.
+
+    Args:
+        volume_configs: Volume configurations of the array
+        ebs_volumes: Result of ebs.create_ebs_volumes for hot-attached volumes
+        instance: Instance the volumes were mapped on at launch
+
+    Returns:
+        List of volume outputs (IDs may be Outputs)
+    """
+    volume_outputs = []
+    for config in volume_configs:
+        volume_id = None
+        if ebs_volumes is not None:
+            volume_id = ebs_volumes["volumes"][config["name"]].id
+        elif instance is not None:
+            volume_id = instance.ebs_block_devices.apply(
+                lambda devices, device_name=config["device_name"]: next(
+                    (device.volume_id for device in devices or [] if device.device_name == device_name), None
+                )
+            )
+
+        volume_outputs.append({
+            "name": config["name"],
+            "device_name": config["device_name"],
+            "volume_id": volume_id,
+            "size": config["size"],
+            "type": config["type"],
+            "iops": config.get("iops"),
+            "throughput": config.get("throughput"),
+        })
+    return volume_outputs
+
+def build_array_output(name: str, layout: str, mount_point: str, filesystem: str, volumes: List[VolumeOutput]) -> ArrayOutput:
+    """
+    Describe one storage array.
+
+    Args:
+        name: Array name (key under the arrays output)
+        layout: How the volumes are combined (lvm, raid0, raid1, ...)
+        mount_point: Where the array is mounted
+        filesystem: Filesystem type
+        volumes: Output of build_volume_outputs
+
+    Returns:
+        Array output
+    """
+    return {
+        "name": name,
+        "layout": layout,
+        "mount_point": mount_point,
+        "filesystem": filesystem,
+        "volumes": volumes,
+    }
+
+def build_connection_output(instance, ssh_port: int = 22) -> ConnectionOutput:
+    """
+    Describe how to reach an instance (the SSH key stays in its own secret output).
+
+    Args:
+        instance: EC2 instance resource
+        ssh_port: SSH port allowed by the security group
+
+    Returns:
+        Connection output (values are Outputs)
+    """
+    return {
+        "instance_id": instance.id,
+        "public_ip": instance.public_ip,
+        "public_dns": instance.public_dns,
+        "ssh_port": ssh_port,
+    }
+
+def read_stack_outputs(stack_name: str, array_name: Optional[str] = None) -> Dict[str, pulumi.Output]:
+    """
+    Read the storage outputs of another stack of this project.
+
+    Args:
+        stack_name: Fully qualified stack name (org/project/stack), or just the
+            stack name for the local backend
+        array_name: Return only this array under "array" instead of every array
+
+    Returns:
+        Dictionary with "arrays" (or "array") and "connection" Outputs
+    """
+    reference = pulumi.StackReference(f"{stack_name}-storage", stack_name=stack_name)
+    arrays = reference.get_output("arrays")
+    outputs = {"connection": reference.get_output("connection")}
+    if array_name is None:
+        outputs["arrays"] = arrays
+    else:
+        outputs["array"] = arrays.apply(lambda value: (value or {}).get(array_name))
+    return outputs
@@ -0,0 +1,348 @@
+"""
+Storage Benchmark Stage
+
+Optional fio job matrix that runs on the instance after the array is mounted,
+saves the raw results under /var/lib/storage-bench and publishes a compact
+summary to SSM Parameter Store (or instance tags), so the stack can report
+measured next to planned performance.
+"""
+
+import json
+import pulumi
+import pulumi_aws as aws
+from typing import Dict, Any, List, Optional
+
+# Bounded job matrix: 4k random IO for IOPS, 1M sequential IO for throughput
+FIO_JOBS = [
+    {"name": "randread-4k", "rw": "randread", "bs": "4k"},
+    {"name": "randwrite-4k", "rw": "randwrite", "bs": "4k"},
+    {"name": "seqread-1m", "rw": "read", "bs": "1M"},
+    {"name": "seqwrite-1m", "rw": "write", "bs": "1M"},
+]
+
+RESULTS_DIR = "/var/lib/storage-bench"
+BENCHMARK_SCRIPT = "/usr/local/bin/storage-benchmark.sh"
+PARAMETER_ROOT = "/pulumi-infra"
+TAG_PREFIX = "storage-bench"
+
+DEFAULT_BENCHMARK_CONFIG = {
+    "queue_depth": 32,
+    "runtime": 30,
+    "size": "1G",
+    # "ssm" writes one parameter per instance, "tags" tags the instance, "none" only keeps local results
+    "publish": "ssm",
+}
+
+# Turns summary.json into the JSON --tags argument of `aws ec2 create-tags`.
+# Values use "/" between fields: the CLI's shorthand syntax would split on commas.
+TAGS_PROGRAM = """import json, sys
+jobs = json.load(open(sys.argv[1]))["jobs"]
+print(json.dumps([
+    {"Key": "%s:%s" % (sys.argv[2], name), "Value": "iops=%d/mibps=%s/p99_us=%d" % (result["iops"], result["mibps"], result["p99_us"])}
+    for name, result in sorted(jobs.items())
+]))"""
+
+# Baseline performance per volume when none is provisioned explicitly
+GP3_BASELINE_IOPS = 3000
+GP3_BASELINE_THROUGHPUT = 125
+
+def get_parameter_prefix(array_name: str) -> str:
+    """
+    Return the SSM parameter path that instances publish their results under.
+
+    Args:
+        array_name: Name of the array (e.g. logical-volume)
+
+    Returns:
+        Parameter path scoped to this project and stack
+    """
+    return f"{PARAMETER_ROOT}/{pulumi.get_project()}/{pulumi.get_stack()}/benchmarks/{array_name}"
+
+def get_benchmark_config(array_name: str, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build a benchmark configuration with defaults filled in.
+
+    Args:
+        array_name: Name of the array the results are reported for
+        overrides: Values replacing the defaults (queue_depth, runtime, size, publish)
+
+    Returns:
+        Benchmark configuration dictionary
+    """
+    benchmark_config = dict(DEFAULT_BENCHMARK_CONFIG)
+    benchmark_config.update({key: value for key, value in (overrides or {}).items() if value is not None})
+    if benchmark_config["publish"] not in ("ssm", "tags", "none"):
+        raise ValueError(f"Unsupported benchmark publish target: {benchmark_config['publish']}")
+    benchmark_config["array_name"] = array_name
+    benchmark_config.setdefault("parameter_prefix", get_parameter_prefix(array_name))
+    return benchmark_config
+
+def create_benchmark_user_data(mount_point: str, benchmark_config: Dict[str, Any]) -> str:
+    """
+    Generate the user data section that benchmarks a mounted array.
+
+    The benchmark is installed as a script and started in the background, so
+    it doesn't hold up the rest of the boot (or a fleet lifecycle hook).
+
+    Args:
+        mount_point: Mount point of the array to benchmark
+        benchmark_config: Configuration from get_benchmark_config
+
+    Returns:
+        User data script section as string
+    """
+    queue_depth = benchmark_config["queue_depth"]
+    runtime = benchmark_config["runtime"]
+    size = benchmark_config["size"]
+    publish = benchmark_config["publish"]
+    parameter_prefix = benchmark_config["parameter_prefix"]
+    job_list = " ".join(f"{job['name']}:{job['rw']}:{job['bs']}" for job in FIO_JOBS)
+
+    return f"""
+# Benchmark the array in the background once it is mounted
+echo "Installing storage benchmark..."
+cat > {BENCHMARK_SCRIPT} <<'BENCH'
+#!/bin/bash
+# fio job matrix for {mount_point}; raw results are kept in {RESULTS_DIR}
+if ! command -v fio &> /dev/null; then
+    if command -v yum &> /dev/null; then
+        yum install -y fio
+    elif command -v apt-get &> /dev/null; then
+        apt-get update && apt-get install -y fio
+    fi
+fi
+
+mkdir -p {RESULTS_DIR} {mount_point}/.storage-bench
+for job in {job_list}; do
+    IFS=: read -r name rw bs <<< "$job"
+    echo "Running fio job $name..."
+    fio --name=$name --directory={mount_point}/.storage-bench --rw=$rw --bs=$bs \\
+        --iodepth={queue_depth} --ioengine=libaio --direct=1 --size={size} \\
+        --runtime={runtime} --time_based --group_reporting \\
+        --output-format=json --output={RESULTS_DIR}/$name.json
+done
+rm -rf {mount_point}/.storage-bench
+
+# Compact summary: IOPS, MiB/s and p99 completion latency per job
+PYTHON=$(command -v python3 || command -v python)
+$PYTHON - {RESULTS_DIR} {queue_depth} {runtime} > {RESULTS_DIR}/summary.json <<'PY'
+import glob, json, os, sys, time
+results_dir, queue_depth, runtime = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+summary = {{"time": int(time.time()), "queue_depth": queue_depth, "runtime": runtime, "jobs": {{}}}}
+for path in sorted(glob.glob(os.path.join(results_dir, "*.json"))):
+    name = os.path.basename(path)[:-len(".json")]
+    if name == "summary":
+        continue
+    try:
+        job = json.load(open(path))["jobs"][0]
+    except (ValueError, KeyError, IndexError):
+        continue
+    side = job["write"] if "write" in job["jobname"] else job["read"]
+    # fio 3.x reports clat_ns, older releases clat in microseconds
+    if "clat_ns" in side:
+        p99_us = side["clat_ns"].get("percentile", {{}}).get("99.000000", 0) / 1000.0
+    else:
+        p99_us = side.get("clat", {{}}).get("percentile", {{}}).get("99.000000", 0)
+    summary["jobs"][name] = {{
+        "iops": int(side["iops"]),
+        "mibps": round(side["bw"] / 1024.0, 1),
+        "p99_us": int(p99_us),
+    }}
+print(json.dumps(summary, separators=(",", ":"), sort_keys=True))
+PY
+
+TOKEN=$(curl -s -X PUT "http://169.254.169.254/latest/api/token" -H "X-aws-ec2-metadata-token-ttl-seconds: 300")
+metadata() {{
+    curl -s -H "X-aws-ec2-metadata-token: $TOKEN" "http://169.254.169.254/latest/meta-data/$1"
+}}
+INSTANCE_ID=$(metadata instance-id)
+REGION=$(metadata placement/region)
+
+if [ "{publish}" = "ssm" ]; then
+    aws ssm put-parameter --region "$REGION" --type String --overwrite \\
+        --name "{parameter_prefix}/$INSTANCE_ID" \\
+        --value "file://{RESULTS_DIR}/summary.json"
+elif [ "{publish}" = "tags" ]; then
+    TAGS=$($PYTHON - {RESULTS_DIR}/summary.json {TAG_PREFIX} <<'PY'
+{TAGS_PROGRAM}
+PY
+)
+    aws ec2 create-tags --region "$REGION" --resources "$INSTANCE_ID" --tags "$TAGS"
+fi
+echo "Storage benchmark complete, results in {RESULTS_DIR}"
+BENCH
+chmod 755 {BENCHMARK_SCRIPT}
+nohup {BENCHMARK_SCRIPT} > /var/log/storage-benchmark.log 2>&1 &
+"""
+
+def get_benchmark_policy(benchmark_config: Dict[str, Any]) -> Optional[str]:
+    """
+    Return the IAM policy document instances need to publish their results.
+
+    Args:
+        benchmark_config: Configuration from get_benchmark_config
+
+    Returns:
+        Policy document JSON, or None when results are only kept on the instance
+    """
+    if benchmark_config["publish"] == "ssm":
+        statement = {
+            "Effect": "Allow",
+            "Action": "ssm:PutParameter",
+            "Resource": f"arn:aws:ssm:*:*:parameter{benchmark_config['parameter_prefix']}/*"
+        }
+    elif benchmark_config["publish"] == "tags":
+        statement = {
+            "Effect": "Allow",
+            "Action": "ec2:CreateTags",
+            "Resource": "arn:aws:ec2:*:*:instance/*",
+            # Only instances launched by this program (single instance and fleet alike)
+            "Condition": {
+                "StringEquals": {"aws:ResourceTag/Name": "Pulumi-EC2"}
+            }
+        }
+    else:
+        return None
+
+    return json.dumps({"Version": "2012-10-17", "Statement": [statement]})
+
+def create_benchmark_instance_profile(benchmark_config: Dict[str, Any], name_prefix: str = "", opts: Optional[pulumi.ResourceOptions] = None):
+    """
+    Create the IAM role and instance profile that let a single instance publish its results.
+
+    Args:
+        benchmark_config: Configuration from get_benchmark_config
+        name_prefix: Prefix for resource names (e.g. the region when deploying several)
+        opts: Resource options, e.g. an explicit regional provider
+
+    Returns:
+        Instance profile resource, or None when nothing is published
+    """
+    policy = get_benchmark_policy(benchmark_config)
+    if policy is None:
+        return None
+
+    role = aws.iam.Role(f"{name_prefix}benchmark-instance-role",
+        assume_role_policy=json.dumps({
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Effect": "Allow",
+                "Principal": {"Service": "ec2.amazonaws.com"},
+                "Action": "sts:AssumeRole"
+            }]
+        }),
+        tags={"ManagedBy": "pulumi"},
+        opts=opts
+    )
+
+    aws.iam.RolePolicy(f"{name_prefix}benchmark-publish-results",
+        role=role.id,
+        policy=policy,
+        opts=opts
+    )
+
+    return aws.iam.InstanceProfile(f"{name_prefix}benchmark-instance-profile", role=role.name, opts=opts)
+
+def get_planned_performance(volume_configs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Add up the provisioned performance of an array's volumes.
+
+    The figures are the upper bound for a striped array; the instance's own EBS
+    bandwidth limit and the array layout (mirroring, parity) can lower them.
+
+    Args:
+        volume_configs: Volume configurations of the array
+
+    Returns:
+        Dictionary with volume count, total size, IOPS and throughput (MiB/s)
+    """
+    planned = {"volume_count": len(volume_configs), "size": 0, "iops": 0, "throughput": 0}
+    for config in volume_configs:
+        volume_type = config.get("type", "gp3")
+        size = config.get("size", 0)
+        planned["size"] += size
+        if volume_type == "gp2":
+            # gp2 scales with size: 3 IOPS/GiB, 100 to 16000; throughput up to 250 MiB/s
+            planned["iops"] += config.get("iops") or min(max(3 * size, 100), 16000)
+            planned["throughput"] += config.get("throughput") or 250
+        else:
+            planned["iops"] += config.get("iops") or GP3_BASELINE_IOPS
+            planned["throughput"] += config.get("throughput") or GP3_BASELINE_THROUGHPUT
+    return planned
+
+def parse_benchmark_parameters(names: List[str], values: List[str]) -> Dict[str, Any]:
+    """
+    Turn published SSM parameters into a mapping of instance ID to summary.
+
+    Args:
+        names: Parameter names (<prefix>/<instance-id>)
+        values: Parameter values (summary JSON)
+
+    Returns:
+        Dictionary of instance ID -> benchmark summary; unreadable values are skipped
+    """
+    results = {}
+    for name, value in zip(names, values):
+        try:
+            results[name.rsplit("/", 1)[-1]] = json.loads(value)
+        except ValueError:
+            continue
+    return results
+
+def get_benchmark_results(benchmark_config: Dict[str, Any], opts: Optional[pulumi.InvokeOptions] = None) -> pulumi.Output:
+    """
+    Read the results instances have published to SSM Parameter Store.
+
+    Instances publish after they boot, so results show up from the next
+    update (or `pulumi refresh`) on; until then the mapping is empty.
+
+    Args:
+        benchmark_config: Configuration from get_benchmark_config
+        opts: Invoke options, e.g. an explicit regional provider
+
+    Returns:
+        Output of instance ID -> benchmark summary
+    """
+    parameters = aws.ssm.get_parameters_by_path_output(
+        path=benchmark_config["parameter_prefix"],
+        recursive=True,
+        opts=opts
+    )
+    return pulumi.Output.all(parameters.names, parameters.values).apply(
+        lambda args: parse_benchmark_parameters(args[0] or [], args[1] or [])
+    )
+
+def get_tagged_benchmark_results(instance_id: pulumi.Input[str], opts: Optional[pulumi.InvokeOptions] = None) -> pulumi.Output:
+    """
+    Read the results an instance has published as tags.
+
+    Args:
+        instance_id: Instance to read the tags of
+        opts: Invoke options, e.g. an explicit regional provider
+
+    Returns:
+        Output of job name -> benchmark summary
+    """
+    return aws.ec2.get_instance_output(instance_id=instance_id, opts=opts).tags.apply(parse_benchmark_tags)
+
+def parse_benchmark_tags(tags: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Turn storage-bench:<job> instance tags back into a job summary.
+
+    Args:
+        tags: Instance tags
+
+    Returns:
+        Dictionary of job name -> iops, mibps and p99_us
+    """
+    jobs = {}
+    for key, value in (tags or {}).items():
+        if not key.startswith(f"{TAG_PREFIX}:"):
+            continue
+        fields = dict(field.split("=", 1) for field in value.split("/") if "=" in field)
+        jobs[key[len(TAG_PREFIX) + 1:]] = {
+            "iops": int(fields.get("iops", 0)),
+            "mibps": float(fields.get("mibps", 0)),
+            "p99_us": int(fields.get("p99_us", 0)),
+        }
+    return jobs
@@ -5,6 +5,12 @@ This file contains example RAID configurations for different use cases.
 """
 
 import raid.raid_config as raid_config
+import ebs.device_slots as device_slots
+from typing import Dict, Any, Optional
+
+# Where create_logical_volume_setup mounts the volume group
+LOGICAL_VOLUME_MOUNT_POINT = "/mnt/logical-storage"
+LOGICAL_VOLUME_FILESYSTEM = "ext4"
 
 def get_raid_0_config():
     """
@@ -101,38 +107,40 @@ def get_custom_raid_config(raid_level: int, device_names: list, mount_point: str
         "description": f"Custom RAID {raid_level} configuration"
     }
 
-def get_volume_configs_for_raid(raid_level: int, volume_size: int = 10):
+def get_volume_configs_for_raid(raid_level: int, volume_size: int = 10, volume_count: Optional[int] = None, allocator: Optional[device_slots.DeviceSlotAllocator] = None):
     """
     Generate EBS volume configurations for a specific RAID level.
     
     Args:
         raid_level: RAID level
         volume_size: Size of each volume in GB
+        volume_count: Number of volumes (defaults to a sensible count for the RAID level)
+        allocator: Device slot allocator for the target instance
     
     Returns:
         List of volume configurations
     """
-    raid_info = raid_config.get_raid_configuration(raid_level, 2)  # Minimum volumes
-    
     # Determine number of volumes based on RAID level
-    if raid_level == 0:
-        volume_count = 3  # Good performance with 3 volumes
-    elif raid_level == 1:
-        volume_count = 2
-    elif raid_level == 5:
-        volume_count = 4  # Good balance for RAID 5
-    elif raid_level == 6:
-        volume_count = 5  # Minimum 4, but 5 is better
-    elif raid_level == 10:
-        volume_count = 4
-    else:
-        raise ValueError(f"Unsupported RAID level: {raid_level}")
+    if volume_count is None:
+        if raid_level == 0:
+            volume_count = 3  # Good performance with 3 volumes
+        elif raid_level == 1:
+            volume_count = 2
+        elif raid_level == 5:
+            volume_count = 4  # Good balance for RAID 5
+        elif raid_level == 6:
+            volume_count = 5  # Minimum 4, but 5 is better
+        elif raid_level == 10:
+            volume_count = 4
+        else:
+            raise ValueError(f"Unsupported RAID level: {raid_level}")
+    
+    raid_config.get_raid_configuration(raid_level, volume_count)
     
-    # Generate device names
-    device_names = []
-    for i in range(volume_count):
-        device_name = f"/dev/sd{chr(ord('c') + i)}"  # sdf, sdg, sdh, etc.
-        device_names.append(device_name)
+    # Generate device names (sdf, sdg, sdh, ..., then xvdba, xvdbb, ...)
+    if allocator is None:
+        allocator = device_slots.DeviceSlotAllocator()
+    device_names = allocator.allocate_many(f"raid-volume-{i+1}" for i in range(volume_count))
     
     # Generate volume configurations
     volume_configs = []
@@ -174,13 +182,26 @@ def create_raid_10_setup():
     volume_configs = get_volume_configs_for_raid(10, 100)
     return config, user_data, volume_configs
 
-def create_logical_volume_setup():
-    """Example: Create logical volume setup without RAID."""
-    device_names = ["/dev/sdc", "/dev/sdd"]  # Maps to /dev/xvdc and /dev/xvdd
+def create_logical_volume_setup(attach_at_launch: bool = False, volume_count: int = 2, allocator: Optional[device_slots.DeviceSlotAllocator] = None, benchmark_config: Optional[Dict[str, Any]] = None):
+    """
+    Example: Create logical volume setup without RAID.
+    
+    Args:
+        attach_at_launch: Volumes are mapped at launch, so skip the hot-attach wait
+        volume_count: Number of volumes in the volume group
+        allocator: Device slot allocator for the target instance
+        benchmark_config: Optional fio benchmark to run once the volume is mounted
+    """
+    if allocator is None:
+        allocator = device_slots.DeviceSlotAllocator()
+    # sdf, sdg, ... (maps to /dev/xvdf, /dev/xvdg, ...)
+    device_names = allocator.allocate_many(f"logical-volume-{i+1}" for i in range(volume_count))
     user_data = raid_config.create_logical_volume_user_data(
         device_names=device_names,
-        mount_point="/mnt/logical-storage",
-        filesystem="ext4"
+        mount_point=LOGICAL_VOLUME_MOUNT_POINT,
+        filesystem=LOGICAL_VOLUME_FILESYSTEM,
+        wait_for_attach=not attach_at_launch,
+        benchmark_config=benchmark_config
     )
     volume_configs = get_volume_configs_for_logical_volume(device_names, 50)
     return device_names, user_data, volume_configs
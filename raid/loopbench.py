@@ -0,0 +1,420 @@
+"""
+Loop-device test bench
+
+Runs the user data generated by raid.raid_config against sparse files
+attached as loop devices instead of EBS volumes, checks the resulting
+layout and alignment, and records time-to-mount and a short dd throughput
+sample per configuration. Needs root, util-linux (losetup, unshare,
+findmnt), mdadm and lvm2.
+
+Each setup script runs in its own mount namespace with a scratch fstab, so
+nothing is mounted on or written to the host's /etc/fstab. md arrays and
+volume groups are kernel-global, so they get bench-specific names and are
+torn down after every case.
+
+Example:
+    sudo python -m raid.loopbench --output results.json
+    sudo python -m raid.loopbench --case raid0-3x --baseline results.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Any, List, Optional
+
+import raid.raid_config as raid_config
+
+# Names used instead of the production ones, so a bench run can't touch a real array
+BENCH_RAID_DEVICE = "/dev/md/loopbench"
+BENCH_VOLUME_GROUP = "loopbench_vg"
+
+MARKER = "LOOPBENCH"
+
+CASES = {
+    "lvm-2x": {"kind": "lvm", "devices": 2},
+    "raid0-3x": {"kind": "raid", "raid_level": 0, "devices": 3},
+    "raid1-2x": {"kind": "raid", "raid_level": 1, "devices": 2},
+    "raid10-4x": {"kind": "raid", "raid_level": 10, "devices": 4},
+}
+
+REQUIRED_TOOLS = {
+    "lvm": ["losetup", "unshare", "findmnt", "pvcreate", "vgremove", "dd"],
+    "raid": ["losetup", "unshare", "findmnt", "mdadm", "dd"],
+}
+
+def get_cases(names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Look up bench cases by name.
+
+    Args:
+        names: Case names (defaults to every case)
+
+    Returns:
+        Dictionary of case name -> case definition
+    """
+    names = names or list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown case(s): {', '.join(unknown)} (choose from {', '.join(CASES)})")
+    return {name: CASES[name] for name in names}
+
+def missing_tools(cases: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Return the required tools that aren't on PATH for the given cases."""
+    tools = sorted({tool for case in cases.values() for tool in REQUIRED_TOOLS[case["kind"]]})
+    return [tool for tool in tools if shutil.which(tool) is None]
+
+def create_loop_devices(case_dir: str, count: int, size_mb: int) -> List[Dict[str, str]]:
+    """
+    Create sparse backing files and attach them as loop devices.
+
+    Args:
+        case_dir: Directory for the backing files
+        count: Number of devices
+        size_mb: Size of each device in MiB
+
+    Returns:
+        List of {"file", "device"} dictionaries
+    """
+    loop_devices = []
+    try:
+        for i in range(count):
+            backing_file = os.path.join(case_dir, f"volume-{i+1}.img")
+            with open(backing_file, "wb") as f:
+                f.truncate(size_mb * 1024 * 1024)
+            # Direct IO skips the host page cache, which would flatter the throughput sample
+            device = subprocess.run(
+                ["losetup", "--find", "--show", "--direct-io=on", backing_file],
+                check=True, capture_output=True, text=True
+            ).stdout.strip()
+            loop_devices.append({"file": backing_file, "device": device})
+    except Exception:
+        detach_loop_devices(loop_devices)
+        raise
+    return loop_devices
+
+def detach_loop_devices(loop_devices: List[Dict[str, str]]) -> None:
+    """Detach loop devices and delete their backing files."""
+    for loop_device in loop_devices:
+        subprocess.run(["losetup", "-d", loop_device["device"]], capture_output=True)
+        if os.path.exists(loop_device["file"]):
+            os.remove(loop_device["file"])
+
+def sandbox_script(script: str, fstab_path: str) -> str:
+    """
+    Rewrite a generated setup script for the bench.
+
+    The scratch fstab replaces /etc/fstab, the array and volume group get
+    bench names, and mdadm doesn't stop to ask for confirmation.
+
+    Args:
+        script: Script from raid_config
+        fstab_path: Scratch fstab path
+
+    Returns:
+        Rewritten script
+    """
+    return (script
+        .replace("/etc/fstab", fstab_path)
+        .replace("storage_vg", BENCH_VOLUME_GROUP)
+        .replace("mdadm --create ", "mdadm --create --run "))
+
+def create_setup_script(case: Dict[str, Any], devices: List[str], mount_point: str, filesystem: str = "ext4") -> str:
+    """
+    Generate the production setup script for a case, pointed at loop devices.
+
+    Args:
+        case: Case definition
+        devices: Loop device paths (passed through unchanged by the generators)
+        mount_point: Where to mount the array
+        filesystem: Filesystem type
+
+    Returns:
+        Setup script as string
+    """
+    if case["kind"] == "lvm":
+        return raid_config.create_logical_volume_user_data(
+            device_names=devices,
+            mount_point=mount_point,
+            filesystem=filesystem,
+            wait_for_attach=False
+        )
+    return raid_config.create_raid_user_data({
+        "raid_level": case["raid_level"],
+        "device_names": devices,
+        "mount_point": mount_point,
+        "filesystem": filesystem,
+        "raid_device": BENCH_RAID_DEVICE,
+        "wait_for_attach": False
+    })
+
+def create_probe_script(case: Dict[str, Any], setup_script: str, devices: List[str], mount_point: str, fstab_path: str, sample_mb: int) -> str:
+    """
+    Generate the script that runs a setup script inside the sandbox and reports on the result.
+
+    Results are printed as "LOOPBENCH key=value" lines for parse_markers.
+
+    Args:
+        case: Case definition
+        setup_script: Path of the sandboxed setup script
+        devices: Loop device paths
+        mount_point: Mount point used by the setup script
+        fstab_path: Scratch fstab path
+        sample_mb: MiB written and read back for the throughput sample
+
+    Returns:
+        Probe script as string
+    """
+    if case["kind"] == "lvm":
+        layout = f"""echo "{MARKER} lv_devices=$(lvs --noheadings -o devices {BENCH_VOLUME_GROUP}/storage_lv | tr -d ' ' | paste -sd, -)"
+echo "{MARKER} pe_start_kib=$(pvs --noheadings --nosuffix --units k -o pe_start {devices[0]} | tr -d ' ')"
+"""
+    else:
+        layout = f"""mdadm --detail --export {BENCH_RAID_DEVICE} | sed 's/^/{MARKER} /'
+"""
+
+    return f"""#!/bin/bash
+set -e
+now() {{ date +%s.%N; }}
+
+echo "{MARKER} start=$(now)"
+bash {setup_script} < /dev/null
+echo "{MARKER} mounted=$(now)"
+
+# Layout and alignment
+echo "{MARKER} fstype=$(findmnt -n -o FSTYPE --mountpoint {mount_point})"
+SOURCE=$(readlink -f $(findmnt -n -o SOURCE --mountpoint {mount_point}))
+echo "{MARKER} alignment_offset=$(cat /sys/class/block/$(basename $SOURCE)/alignment_offset)"
+echo "{MARKER} fstab_entries=$(grep -c ' {mount_point} ' {fstab_path} || true)"
+{layout}
+# Throughput sample
+echo "{MARKER} write_start=$(now)"
+dd if=/dev/zero of={mount_point}/loopbench.dat bs=1M count={sample_mb} oflag=direct conv=fsync status=none
+echo "{MARKER} write_end=$(now)"
+dd if={mount_point}/loopbench.dat of=/dev/null bs=1M iflag=direct status=none
+echo "{MARKER} read_end=$(now)"
+rm -f {mount_point}/loopbench.dat
+umount {mount_point}
+"""
+
+def parse_markers(output: str) -> Dict[str, str]:
+    """
+    Collect the "LOOPBENCH key=value" lines printed by the probe script.
+
+    Args:
+        output: Probe script output
+
+    Returns:
+        Dictionary of key -> value (later lines win)
+    """
+    markers = {}
+    for line in output.splitlines():
+        if not line.startswith(f"{MARKER} ") or "=" not in line:
+            continue
+        key, _, value = line[len(MARKER) + 1:].partition("=")
+        markers[key.strip()] = value.strip()
+    return markers
+
+def evaluate(case: Dict[str, Any], markers: Dict[str, str], devices: List[str], filesystem: str, sample_mb: int) -> Dict[str, Any]:
+    """
+    Turn probe markers into timings and layout checks.
+
+    Args:
+        case: Case definition
+        markers: Output of parse_markers
+        devices: Loop device paths the case ran on
+        filesystem: Expected filesystem type
+        sample_mb: MiB written and read back for the throughput sample
+
+    Returns:
+        Dictionary with time_to_mount, write_mibps, read_mibps and checks (name -> bool)
+    """
+    def elapsed(start: str, end: str) -> Optional[float]:
+        if start not in markers or end not in markers:
+            return None
+        return float(markers[end]) - float(markers[start])
+
+    time_to_mount = elapsed("start", "mounted")
+    write_seconds = elapsed("write_start", "write_end")
+    read_seconds = elapsed("write_end", "read_end")
+
+    checks = {
+        "mounted": markers.get("fstype") == filesystem,
+        "aligned": markers.get("alignment_offset") == "0",
+        "fstab_entry": markers.get("fstab_entries") == "1",
+    }
+    if case["kind"] == "lvm":
+        lv_devices = [entry.split("(")[0] for entry in markers.get("lv_devices", "").split(",") if entry]
+        checks["all_devices_in_volume_group"] = sorted(lv_devices) == sorted(devices)
+        # LVM's default data alignment is 1 MiB
+        pe_start = markers.get("pe_start_kib", "")
+        checks["pe_start_aligned"] = bool(pe_start) and float(pe_start) % 1024 == 0
+    else:
+        checks["raid_level"] = markers.get("MD_LEVEL") == f"raid{case['raid_level']}"
+        checks["raid_devices"] = markers.get("MD_DEVICES") == str(len(devices))
+
+    return {
+        "time_to_mount": round(time_to_mount, 3) if time_to_mount is not None else None,
+        "write_mibps": round(sample_mb / write_seconds, 1) if write_seconds else None,
+        "read_mibps": round(sample_mb / read_seconds, 1) if read_seconds else None,
+        "checks": checks,
+    }
+
+def teardown(case: Dict[str, Any]) -> None:
+    """Remove the volume group or md array a case created; loop devices are detached separately."""
+    if case["kind"] == "lvm":
+        subprocess.run(["vgremove", "-f", BENCH_VOLUME_GROUP], capture_output=True)
+    elif os.path.exists(BENCH_RAID_DEVICE):
+        subprocess.run(["mdadm", "--stop", BENCH_RAID_DEVICE], capture_output=True)
+
+def run_case(name: str, case: Dict[str, Any], work_dir: str, size_mb: int = 256, sample_mb: int = 64, filesystem: str = "ext4", timeout: int = 600) -> Dict[str, Any]:
+    """
+    Build one configuration on loop devices and measure it.
+
+    Args:
+        name: Case name
+        case: Case definition
+        work_dir: Directory for backing files, scripts and logs
+        size_mb: Size of each loop device in MiB
+        sample_mb: MiB written and read back for the throughput sample
+        filesystem: Filesystem type
+        timeout: Seconds before the setup is abandoned
+
+    Returns:
+        Result dictionary (case, passed, time_to_mount, write_mibps, read_mibps, checks, error, log)
+    """
+    case_dir = os.path.join(work_dir, name)
+    mount_point = os.path.join(case_dir, "mnt")
+    fstab_path = os.path.join(case_dir, "fstab")
+    log_path = os.path.join(case_dir, "run.log")
+    os.makedirs(case_dir, exist_ok=True)
+    open(fstab_path, "w").close()
+
+    result: Dict[str, Any] = {
+        "case": name,
+        "passed": False,
+        "time_to_mount": None,
+        "write_mibps": None,
+        "read_mibps": None,
+        "checks": {},
+        "error": None,
+        "log": log_path
+    }
+
+    loop_devices = []
+    try:
+        loop_devices = create_loop_devices(case_dir, case["devices"], size_mb)
+        devices = [loop_device["device"] for loop_device in loop_devices]
+
+        setup_path = os.path.join(case_dir, "setup.sh")
+        with open(setup_path, "w") as f:
+            f.write(sandbox_script(create_setup_script(case, devices, mount_point, filesystem), fstab_path))
+
+        probe_path = os.path.join(case_dir, "probe.sh")
+        with open(probe_path, "w") as f:
+            f.write(create_probe_script(case, setup_path, devices, mount_point, fstab_path, sample_mb))
+
+        # A private mount namespace keeps the array's mount off the host
+        completed = subprocess.run(
+            ["unshare", "--mount", "--propagation", "private", "bash", probe_path],
+            capture_output=True, text=True, timeout=timeout
+        )
+        with open(log_path, "w") as log_file:
+            log_file.write(completed.stdout)
+            log_file.write(completed.stderr)
+
+        result.update(evaluate(case, parse_markers(completed.stdout), devices, filesystem, sample_mb))
+        if completed.returncode != 0:
+            result["error"] = f"probe exited with {completed.returncode}"
+        result["passed"] = completed.returncode == 0 and all(result["checks"].values())
+    except Exception as error:
+        result["error"] = str(error)
+    finally:
+        teardown(case)
+        detach_loop_devices(loop_devices)
+
+    return result
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float = 0.2) -> List[str]:
+    """
+    Find cases that got slower than a previous run.
+
+    Args:
+        results: Results of this run
+        baseline: Results of a previous run (cases missing from either side are ignored)
+        tolerance: Allowed relative change, e.g. 0.2 for 20%
+
+    Returns:
+        Human-readable regression descriptions (empty when none)
+    """
+    baseline_by_case = {entry["case"]: entry for entry in baseline}
+    regressions = []
+    for result in results:
+        previous = baseline_by_case.get(result["case"])
+        if previous is None:
+            continue
+
+        current_mount, previous_mount = result.get("time_to_mount"), previous.get("time_to_mount")
+        if current_mount is not None and previous_mount and current_mount > previous_mount * (1 + tolerance):
+            regressions.append(f"{result['case']}: time_to_mount {current_mount:.2f}s vs {previous_mount:.2f}s")
+
+        for key in ("write_mibps", "read_mibps"):
+            current, before = result.get(key), previous.get(key)
+            if current is not None and before and current < before * (1 - tolerance):
+                regressions.append(f"{result['case']}: {key} {current:.1f} vs {before:.1f}")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the generated storage scripts on loop devices and measure them.")
+    parser.add_argument("--case", dest="cases", action="append", choices=list(CASES), help="Case to run (repeatable, default: all)")
+    parser.add_argument("--filesystem", choices=["ext4", "xfs"], default="ext4", help="Filesystem type (default: ext4)")
+    parser.add_argument("--size-mb", type=int, default=256, help="Size of each loop device in MiB (default: 256)")
+    parser.add_argument("--sample-mb", type=int, default=64, help="MiB written and read back per case (default: 64)")
+    parser.add_argument("--work-dir", help="Directory for backing files and logs (default: a new temp directory)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Results JSON from a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression against the baseline (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    cases = get_cases(args.cases)
+    if os.geteuid() != 0:
+        print("The loop-device bench needs root (losetup, mdadm, lvm).", file=sys.stderr)
+        return 2
+    missing = missing_tools(cases)
+    if missing:
+        # The setup scripts would otherwise try to install them with yum/apt
+        print(f"Missing tools: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    work_dir = os.path.abspath(args.work_dir or tempfile.mkdtemp(prefix="loopbench-"))
+    results = []
+    for name, case in cases.items():
+        start = time.perf_counter()
+        result = run_case(name, case, work_dir, args.size_mb, args.sample_mb, args.filesystem)
+        results.append(result)
+        status = "passed" if result["passed"] else f"FAILED ({result['error'] or ', '.join(check for check, ok in result['checks'].items() if not ok)})"
+        print(f"[{name}] {status} in {time.perf_counter() - start:.1f}s: "
+              f"time_to_mount={result['time_to_mount']}s write={result['write_mibps']}MiB/s read={result['read_mibps']}MiB/s", flush=True)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+
+    return 0 if all(result["passed"] for result in results) and not regressions else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
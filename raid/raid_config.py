@@ -1,6 +1,19 @@
 import pulumi
+import raid.benchmark as benchmark
+import timing.phases as timing
 from typing import Dict, Any, List, Optional
 
+def _get_attach_wait(wait_for_attach: bool) -> str:
+    """Return the script section that gives hot-attached volumes time to appear."""
+    if not wait_for_attach:
+        return ""
+    return """# Wait for all EBS volumes to be attached and available
+echo "Waiting for EBS volumes to be available..."
+sleep 30
+
+"""
+
+@timing.traced()
 def create_raid_user_data(raid_config: Dict[str, Any]) -> str:
     """
     Generate user data script for software RAID configuration.
@@ -12,6 +25,10 @@ def create_raid_user_data(raid_config: Dict[str, Any]) -> str:
             - mount_point: Where to mount the RAID array
             - filesystem: Filesystem type (ext4, xfs, etc.)
             - raid_device: RAID device name (e.g., /dev/md0)
+            - wait_for_attach: Sleep for hot-attached volumes before polling
+              (set to False when volumes are mapped at launch)
+            - benchmark: Optional benchmark configuration (see
+              raid.benchmark.get_benchmark_config) to run fio once mounted
     
     Returns:
         User data script as string
@@ -22,6 +39,8 @@ def create_raid_user_data(raid_config: Dict[str, Any]) -> str:
     mount_point = raid_config.get("mount_point", "/mnt/raid")
     filesystem = raid_config.get("filesystem", "ext4")
     raid_device = raid_config.get("raid_device", "/dev/md0")
+    wait_for_attach = raid_config.get("wait_for_attach", True)
+    benchmark_config = raid_config.get("benchmark")
     
     # Convert device names to actual block device paths
     # AWS typically maps /dev/sdf to /dev/xvdf, /dev/sdg to /dev/xvdg, etc.
@@ -34,15 +53,14 @@ def create_raid_user_data(raid_config: Dict[str, Any]) -> str:
         else:
             block_devices.append(device)
     
+    attach_wait = _get_attach_wait(wait_for_attach)
+    benchmark_stage = benchmark.create_benchmark_user_data(mount_point, benchmark_config) if benchmark_config else ""
+    
     user_data_script = f"""#!/bin/bash
 # Software RAID Configuration Script
 set -e
 
-# Wait for all EBS volumes to be attached and available
-echo "Waiting for EBS volumes to be available..."
-sleep 30
-
-# Check if devices exist
+{attach_wait}# Check if devices exist
 for device in {' '.join(block_devices)}; do
     while [ ! -b $device ]; do
         echo "Waiting for device $device to be available..."
@@ -99,7 +117,7 @@ echo "RAID {raid_level} setup complete!"
 echo "RAID array mounted at {mount_point}"
 echo "RAID status:"
 cat /proc/mdstat
-"""
+{benchmark_stage}"""
     
     return user_data_script
 
@@ -228,7 +246,8 @@ def get_raid_configuration(raid_level: int, volume_count: int) -> Dict[str, Any]
     
     return config
 
-def create_logical_volume_user_data(device_names: List[str], mount_point: str = "/mnt/logical-volume", filesystem: str = "ext4") -> str:
+@timing.traced()
+def create_logical_volume_user_data(device_names: List[str], mount_point: str = "/mnt/logical-volume", filesystem: str = "ext4", wait_for_attach: bool = True, benchmark_config: Optional[Dict[str, Any]] = None) -> str:
     """
     Generate user data script for logical volume management without RAID.
     
@@ -236,6 +255,10 @@ def create_logical_volume_user_data(device_names: List[str], mount_point: str =
         device_names: List of device names to use for logical volume
         mount_point: Where to mount the logical volume
         filesystem: Filesystem type (ext4, xfs, etc.)
+        wait_for_attach: Sleep for hot-attached volumes before polling
+            (set to False when volumes are mapped at launch)
+        benchmark_config: Optional benchmark configuration (see
+            raid.benchmark.get_benchmark_config) to run fio once mounted
     
     Returns:
         User data script as string
@@ -252,6 +275,9 @@ def create_logical_volume_user_data(device_names: List[str], mount_point: str =
         else:
             block_devices.append(device)
     
+    attach_wait = _get_attach_wait(wait_for_attach)
+    benchmark_stage = benchmark.create_benchmark_user_data(mount_point, benchmark_config) if benchmark_config else ""
+    
     # Create device list for LVM commands
     device_list = ' '.join(block_devices)
     
@@ -259,11 +285,7 @@ def create_logical_volume_user_data(device_names: List[str], mount_point: str =
 # Logical Volume Management Configuration Script
 set -e
 
-# Wait for all EBS volumes to be attached and available
-echo "Waiting for EBS volumes to be available..."
-sleep 30
-
-# Check if devices exist
+{attach_wait}# Check if devices exist
 for device in {device_list}; do
     while [ ! -b $device ]; do
         echo "Waiting for device $device to be available..."
@@ -328,6 +350,6 @@ echo "Logical volume information:"
 lvs
 echo "Physical volume information:"
 pvs
-"""
+{benchmark_stage}"""
     
     return user_data_script 
\ No newline at end of file
@@ -1,7 +1,11 @@
 import pulumi_aws as aws
+import pulumi
+import timing.phases as timing
+from typing import Optional
 
-def create_ssh_security_group(vpc_id):
-    return aws.ec2.SecurityGroup("web-secgrp",
+@timing.traced()
+def create_ssh_security_group(vpc_id, name_prefix: str = "", opts: Optional[pulumi.ResourceOptions] = None):
+    return aws.ec2.SecurityGroup(f"{name_prefix}web-secgrp",
         description="Enable SSH access",
         vpc_id=vpc_id,
         ingress=[{
@@ -9,5 +13,6 @@ def create_ssh_security_group(vpc_id):
         }],
         egress=[{
             "protocol": "-1", "from_port": 0, "to_port": 0, "cidr_blocks": ["0.0.0.0/0"],
-        }]
+        }],
+        opts=opts
     )
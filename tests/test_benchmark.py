@@ -0,0 +1,92 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import raid.benchmark as benchmark
+import raid.raid_config as raid_config
+
+PREFIX = "/pulumi-infra/test/dev/benchmarks/logical-volume"
+
+def make_config(**overrides):
+    overrides.setdefault("parameter_prefix", PREFIX)
+    return benchmark.get_benchmark_config("logical-volume", overrides)
+
+def test_config_defaults_fill_unset_values():
+    config = make_config(queue_depth=None, runtime=10)
+    assert config["queue_depth"] == 32
+    assert config["runtime"] == 10
+    assert config["publish"] == "ssm"
+    assert config["array_name"] == "logical-volume"
+
+def test_config_rejects_unknown_publish_target():
+    with pytest.raises(ValueError, match="Unsupported benchmark publish target"):
+        make_config(publish="s3")
+
+def test_user_data_runs_the_whole_job_matrix():
+    script = benchmark.create_benchmark_user_data("/mnt/data", make_config(queue_depth=8, runtime=5))
+    for job in ("randread-4k:randread:4k", "randwrite-4k:randwrite:4k", "seqread-1m:read:1M", "seqwrite-1m:write:1M"):
+        assert job in script
+    assert "--iodepth=8" in script
+    assert "--runtime=5" in script
+    assert f'--name "{PREFIX}/$INSTANCE_ID"' in script
+
+def test_generators_only_append_the_stage_when_configured():
+    without = raid_config.create_logical_volume_user_data(["/dev/sdf"], "/mnt/data")
+    with_stage = raid_config.create_logical_volume_user_data(["/dev/sdf"], "/mnt/data", benchmark_config=make_config())
+    assert benchmark.BENCHMARK_SCRIPT not in without
+    assert with_stage.startswith(without)
+    assert benchmark.BENCHMARK_SCRIPT in raid_config.create_raid_user_data({
+        "device_names": ["/dev/sdf", "/dev/sdg"],
+        "benchmark": make_config()
+    })
+
+def test_policy_matches_publish_target():
+    assert PREFIX in json.loads(benchmark.get_benchmark_policy(make_config()))["Statement"][0]["Resource"]
+    assert json.loads(benchmark.get_benchmark_policy(make_config(publish="tags")))["Statement"][0]["Action"] == "ec2:CreateTags"
+    assert benchmark.get_benchmark_policy(make_config(publish="none")) is None
+
+def test_planned_performance_uses_baselines_unless_provisioned():
+    planned = benchmark.get_planned_performance([
+        {"size": 50, "type": "gp3"},
+        {"size": 50, "type": "gp3", "iops": 6000, "throughput": 250},
+        {"size": 100, "type": "gp2"},
+    ])
+    assert planned == {"volume_count": 3, "size": 200, "iops": 3000 + 6000 + 300, "throughput": 125 + 250 + 250}
+
+def test_parse_parameters_keys_by_instance_and_skips_bad_values():
+    results = benchmark.parse_benchmark_parameters(
+        [f"{PREFIX}/i-1", f"{PREFIX}/i-2"],
+        ['{"jobs": {"randread-4k": {"iops": 3000}}}', "not json"]
+    )
+    assert results == {"i-1": {"jobs": {"randread-4k": {"iops": 3000}}}}
+
+def test_parse_tags_reads_only_benchmark_tags():
+    jobs = benchmark.parse_benchmark_tags({
+        "Name": "Pulumi-EC2",
+        "storage-bench:seqread-1m": "iops=125/mibps=125.3/p99_us=900"
+    })
+    assert jobs == {"seqread-1m": {"iops": 125, "mibps": 125.3, "p99_us": 900}}
+
+def test_tags_argument_round_trips_through_create_tags(tmp_path):
+    summary = {"jobs": {
+        "randread-4k": {"iops": 3012, "mibps": 11.8, "p99_us": 1234},
+        "seqwrite-1m": {"iops": 125, "mibps": 125.0, "p99_us": 8000},
+    }}
+    summary_path = tmp_path / "summary.json"
+    summary_path.write_text(json.dumps(summary))
+
+    # Same program and arguments the generated script passes to $PYTHON
+    script = benchmark.create_benchmark_user_data("/mnt/data", make_config(publish="tags"))
+    assert benchmark.TAGS_PROGRAM in script
+    assert '--tags "$TAGS"' in script
+    argument = subprocess.run(
+        [sys.executable, "-", str(summary_path), benchmark.TAG_PREFIX],
+        input=benchmark.TAGS_PROGRAM, capture_output=True, text=True, check=True
+    ).stdout
+
+    # JSON --tags skips the CLI's comma-splitting shorthand parser
+    tags = json.loads(argument)
+    assert all(set(tag) == {"Key", "Value"} and "," not in tag["Value"] for tag in tags)
+    assert benchmark.parse_benchmark_tags({tag["Key"]: tag["Value"] for tag in tags}) == summary["jobs"]
@@ -0,0 +1,68 @@
+import pytest
+
+import ebs.device_slots as device_slots
+
+def test_allocates_from_sdf_in_order():
+    allocator = device_slots.DeviceSlotAllocator()
+    assert allocator.allocate_many(["a", "b", "c"]) == ["/dev/sdf", "/dev/sdg", "/dev/sdh"]
+
+def test_same_key_returns_same_device():
+    allocator = device_slots.DeviceSlotAllocator()
+    first = allocator.allocate("a")
+    allocator.allocate("b")
+    assert allocator.allocate("a") == first
+
+def test_rolls_over_from_sdp_to_xvd_range():
+    allocator = device_slots.DeviceSlotAllocator()
+    devices = allocator.allocate_many(f"v{i}" for i in range(13))
+    assert devices[10] == "/dev/sdp"
+    assert devices[11:] == ["/dev/xvdba", "/dev/xvdbb"]
+
+def test_runs_out_of_slots():
+    allocator = device_slots.DeviceSlotAllocator()
+    slot_count = len(device_slots.SD_SLOTS) + len(device_slots.XVD_SLOTS)
+    allocator.allocate_many(f"v{i}" for i in range(slot_count))
+    with pytest.raises(ValueError, match="No free device slots"):
+        allocator.allocate("one-too-many")
+
+def test_reserved_names_are_skipped_across_sd_and_xvd_aliases():
+    allocator = device_slots.DeviceSlotAllocator(reserved=["/dev/xvdf"])
+    assert not allocator.is_free("/dev/sdf")
+    assert allocator.allocate("a") == "/dev/sdg"
+
+def test_canonical_device_name():
+    assert device_slots.canonical_device_name("/dev/xvdf") == "/dev/sdf"
+    assert device_slots.canonical_device_name("/dev/xvdba") == "/dev/sdba"
+    assert device_slots.canonical_device_name("/dev/sdg") == "/dev/sdg"
+
+def test_root_devices_are_reserved():
+    allocator = device_slots.DeviceSlotAllocator()
+    assert not allocator.is_free("/dev/xvda")
+    assert not allocator.is_free("/dev/sda1")
+
+def test_reserving_an_assigned_device_fails():
+    allocator = device_slots.DeviceSlotAllocator()
+    allocator.allocate("a")
+    with pytest.raises(ValueError, match="already assigned"):
+        allocator.reserve("/dev/xvdf")
+
+def test_existing_mapping_conflicting_with_reserved_fails():
+    with pytest.raises(ValueError, match="already in use"):
+        device_slots.DeviceSlotAllocator(reserved=["/dev/sdf"], existing={"a": "/dev/xvdf"})
+
+def test_existing_mapping_is_kept_when_a_middle_member_is_removed():
+    allocator = device_slots.DeviceSlotAllocator(existing={"v1": "/dev/sdf", "v3": "/dev/sdh"})
+    assert allocator.allocate("v3") == "/dev/sdh"
+    assert allocator.allocate("v4") == "/dev/sdg"
+
+def test_preferred_device_used_when_free():
+    allocator = device_slots.DeviceSlotAllocator()
+    assert allocator.allocate("a", preferred="/dev/sdk") == "/dev/sdk"
+    assert allocator.allocate("b", preferred="/dev/xvdk") == "/dev/sdf"
+
+def test_release_frees_slot_for_reuse():
+    allocator = device_slots.DeviceSlotAllocator()
+    allocator.allocate_many(["a", "b"])
+    allocator.release("a")
+    assert allocator.allocate("c") == "/dev/sdf"
+    assert allocator.assignments() == {"b": "/dev/sdg", "c": "/dev/sdf"}
@@ -0,0 +1,44 @@
+import yaml
+
+import deploy.driver as driver
+
+def make_project(tmp_path, stack_settings=None):
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+    (project_dir / "Pulumi.yaml").write_text("name: ec2-package\nruntime: python\n")
+    if stack_settings is not None:
+        (project_dir / "Pulumi.dev.yaml").write_text(yaml.safe_dump(stack_settings))
+    return project_dir
+
+def test_workspace_copies_project_and_leaves_repo_stack_file_alone(tmp_path, monkeypatch):
+    project_dir = make_project(tmp_path, {"config": {"aws:region": "eu-west-2"}})
+    monkeypatch.setattr(driver, "PROJECT_DIR", str(project_dir))
+    original = (project_dir / "Pulumi.dev.yaml").read_text()
+
+    work_dir = driver.prepare_workspace("dev", str(tmp_path / "driver" / "dev"))
+
+    assert (tmp_path / "driver" / "dev" / "workspace" / "Pulumi.yaml").exists()
+    assert yaml.safe_load(open(f"{work_dir}/Pulumi.dev.yaml"))["config"] == {"aws:region": "eu-west-2"}
+    # Config written by the Automation API goes to the copy
+    with open(f"{work_dir}/Pulumi.dev.yaml", "a") as f:
+        f.write("secretsprovider: passphrase\n")
+    assert (project_dir / "Pulumi.dev.yaml").read_text() == original
+
+def test_workspace_refreshes_config_but_keeps_secrets_provider(tmp_path, monkeypatch):
+    project_dir = make_project(tmp_path, {"config": {"aws:region": "eu-west-2"}})
+    monkeypatch.setattr(driver, "PROJECT_DIR", str(project_dir))
+    work_dir = driver.prepare_workspace("dev", str(tmp_path / "dev"))
+    with open(f"{work_dir}/Pulumi.dev.yaml", "w") as f:
+        yaml.safe_dump({"config": {"ec2-package:key_path": "/tmp/key"}, "encryptionsalt": "v1:salt"}, f)
+
+    work_dir = driver.prepare_workspace("org/ec2-package/dev", str(tmp_path / "dev"))
+
+    assert yaml.safe_load(open(f"{work_dir}/Pulumi.dev.yaml")) == {
+        "config": {"aws:region": "eu-west-2"},
+        "encryptionsalt": "v1:salt",
+    }
+
+def test_workspace_for_stack_without_repo_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(driver, "PROJECT_DIR", str(make_project(tmp_path)))
+    work_dir = driver.prepare_workspace("team-a", str(tmp_path / "team-a"))
+    assert yaml.safe_load(open(f"{work_dir}/Pulumi.team-a.yaml")) == {}
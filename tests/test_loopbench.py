@@ -0,0 +1,62 @@
+import pytest
+
+import raid.loopbench as loopbench
+
+DEVICES = ["/dev/loop0", "/dev/loop1"]
+
+def test_get_cases_rejects_unknown_names():
+    assert list(loopbench.get_cases(["lvm-2x"])) == ["lvm-2x"]
+    with pytest.raises(ValueError, match="Unknown case"):
+        loopbench.get_cases(["raid7"])
+
+def test_setup_script_uses_loop_devices_without_attach_wait():
+    script = loopbench.create_setup_script(loopbench.CASES["lvm-2x"], DEVICES, "/tmp/bench/mnt")
+    assert "vgcreate storage_vg /dev/loop0 /dev/loop1" in script
+    assert "sleep 30" not in script
+
+def test_sandbox_script_keeps_host_state_out_of_reach():
+    script = loopbench.create_setup_script(loopbench.CASES["raid1-2x"], DEVICES, "/tmp/bench/mnt")
+    sandboxed = loopbench.sandbox_script(script, "/tmp/bench/fstab")
+    assert "/etc/fstab" not in sandboxed
+    assert ">> /tmp/bench/fstab" in sandboxed
+    assert f"mdadm --create --run {loopbench.BENCH_RAID_DEVICE}" in sandboxed
+    lvm = loopbench.sandbox_script(loopbench.create_setup_script(loopbench.CASES["lvm-2x"], DEVICES, "/mnt"), "/tmp/fstab")
+    assert "storage_vg" not in lvm.replace(loopbench.BENCH_VOLUME_GROUP, "")
+
+def test_parse_markers_ignores_other_output():
+    output = "Creating RAID 0 array...\nLOOPBENCH start=1.5\nLOOPBENCH MD_LEVEL=raid0\nmdadm: array started\n"
+    assert loopbench.parse_markers(output) == {"start": "1.5", "MD_LEVEL": "raid0"}
+
+def test_evaluate_raid_case():
+    markers = {
+        "start": "10.0", "mounted": "12.5", "write_start": "13.0", "write_end": "13.5", "read_end": "13.75",
+        "fstype": "ext4", "alignment_offset": "0", "fstab_entries": "1",
+        "MD_LEVEL": "raid0", "MD_DEVICES": "2",
+    }
+    result = loopbench.evaluate({"kind": "raid", "raid_level": 0}, markers, DEVICES, "ext4", 64)
+    assert result["time_to_mount"] == 2.5
+    assert result["write_mibps"] == 128.0
+    assert result["read_mibps"] == 256.0
+    assert all(result["checks"].values())
+
+def test_evaluate_lvm_case_checks_members_and_alignment():
+    markers = {
+        "fstype": "xfs", "alignment_offset": "0", "fstab_entries": "1",
+        "lv_devices": "/dev/loop0(0),/dev/loop1(0)", "pe_start_kib": "1024.00",
+    }
+    result = loopbench.evaluate({"kind": "lvm"}, markers, DEVICES, "xfs", 64)
+    assert result["time_to_mount"] is None
+    assert all(result["checks"].values())
+    result = loopbench.evaluate({"kind": "lvm"}, dict(markers, pe_start_kib="192.00", lv_devices="/dev/loop0(0)"), DEVICES, "xfs", 64)
+    assert not result["checks"]["pe_start_aligned"]
+    assert not result["checks"]["all_devices_in_volume_group"]
+
+def test_compare_to_baseline_flags_only_changes_beyond_tolerance():
+    baseline = [{"case": "raid0-3x", "time_to_mount": 2.0, "write_mibps": 100.0, "read_mibps": 200.0}]
+    within = [{"case": "raid0-3x", "time_to_mount": 2.3, "write_mibps": 85.0, "read_mibps": 210.0}]
+    assert loopbench.compare_to_baseline(within, baseline, tolerance=0.2) == []
+    slower = [{"case": "raid0-3x", "time_to_mount": 3.0, "write_mibps": 70.0, "read_mibps": 200.0},
+              {"case": "lvm-2x", "time_to_mount": 9.0, "write_mibps": 1.0, "read_mibps": 1.0}]
+    regressions = loopbench.compare_to_baseline(slower, baseline, tolerance=0.2)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("raid0-3x: time_to_mount")
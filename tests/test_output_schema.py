@@ -0,0 +1,28 @@
+import output.schema as schema
+
+CONFIGS = [
+    {"name": "logical-volume-1", "device_name": "/dev/sdf", "size": 50, "type": "gp3"},
+    {"name": "logical-volume-2", "device_name": "/dev/sdg", "size": 50, "type": "gp3", "iops": 6000, "throughput": 250},
+]
+
+class FakeVolume:
+    def __init__(self, volume_id):
+        self.id = volume_id
+
+def test_volume_outputs_without_volumes_carry_config_only():
+    volumes = schema.build_volume_outputs(CONFIGS)
+    assert volumes[0] == {
+        "name": "logical-volume-1", "device_name": "/dev/sdf", "volume_id": None,
+        "size": 50, "type": "gp3", "iops": None, "throughput": None,
+    }
+    assert (volumes[1]["iops"], volumes[1]["throughput"]) == (6000, 250)
+
+def test_volume_outputs_use_ids_of_hot_attached_volumes():
+    ebs_volumes = {"volumes": {config["name"]: FakeVolume(f"vol-{i}") for i, config in enumerate(CONFIGS)}, "attachments": {}}
+    volumes = schema.build_volume_outputs(CONFIGS, ebs_volumes=ebs_volumes)
+    assert [volume["volume_id"] for volume in volumes] == ["vol-0", "vol-1"]
+
+def test_array_output_only_holds_plain_values():
+    array = schema.build_array_output("logical-volume", "lvm", "/mnt/data", "ext4", schema.build_volume_outputs(CONFIGS))
+    assert set(array) == {"name", "layout", "mount_point", "filesystem", "volumes"}
+    assert all(isinstance(value, (str, int, type(None))) for volume in array["volumes"] for value in volume.values())
@@ -0,0 +1,33 @@
+import json
+
+import timing.phases as timing
+
+def read_names(path):
+    with open(path) as f:
+        return [event["name"] for event in json.load(f)["traceEvents"]]
+
+def test_each_run_writes_only_its_own_phases(tmp_path):
+    first, second = tmp_path / "first.json", tmp_path / "second.json"
+
+    timing.enable(str(first))
+    with timing.phase("first_stack"):
+        pass
+    timing.begin("resource_registration")
+    assert timing.finish() == str(first)
+
+    timing.enable(str(second))
+    with timing.phase("second_stack"):
+        pass
+    timing.finish()
+
+    assert read_names(first) == ["first_stack", "resource_registration"]
+    assert read_names(second) == ["second_stack"]
+
+def test_finish_stops_recording(tmp_path):
+    timing.enable(str(tmp_path / "trace.json"))
+    timing.finish()
+    assert not timing.is_enabled()
+    assert timing.finish() is None
+    with timing.phase("after_finish"):
+        pass
+    assert timing.summarize() == {}
@@ -0,0 +1 @@
+# Timing module for opt-in phase instrumentation 
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""
+Opt-in phase timing for the Pulumi program.
+
+Set the PULUMI_INFRA_TRACE_FILE environment variable (or the trace_file
+stack config) to a path, and every phase and instrumented entry point
+records its wall time and memory allocations. The file is written when
+the run finishes (finish, called by the Automation API driver after each
+stack) or otherwise when the program exits, in Chrome trace format (open
+it in chrome://tracing or https://ui.perfetto.dev); a per-phase summary
+is included under "phaseSummary".
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+TRACE_FILE_ENV = "PULUMI_INFRA_TRACE_FILE"
+
+_lock = threading.Lock()
+_events: List[Dict[str, Any]] = []
+_open_phases: Dict[str, Any] = {}
+_trace_path: Optional[str] = None
+_exit_hook_registered = False
+_origin = time.perf_counter()
+
+def enable(path: str) -> None:
+    """
+    Start a new run: drop earlier phases and write this run's to `path` when it finishes.
+
+    Args:
+        path: Output file for the Chrome trace JSON
+    """
+    global _trace_path, _exit_hook_registered
+    if not _exit_hook_registered:
+        atexit.register(finish)
+        _exit_hook_registered = True
+    _trace_path = path
+    with _lock:
+        _events.clear()
+        _open_phases.clear()
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def finish() -> Optional[str]:
+    """
+    End the current run: write its trace and stop recording.
+
+    Safe to call more than once; later calls do nothing until enable is called again.
+
+    Returns:
+        Path written, or None if tracing was not enabled
+    """
+    global _trace_path
+    path = write_trace()
+    _trace_path = None
+    with _lock:
+        _events.clear()
+        _open_phases.clear()
+    return path
+
+def is_enabled() -> bool:
+    """Return True if phases are being recorded."""
+    return _trace_path is not None
+
+def _now_us() -> float:
+    return (time.perf_counter() - _origin) * 1_000_000
+
+def record(name: str, start_us: float, duration_us: float, args: Optional[Dict[str, Any]] = None) -> None:
+    """Record a completed phase (times in microseconds since import)."""
+    with _lock:
+        _events.append({
+            "name": name,
+            "ph": "X",
+            "ts": start_us,
+            "dur": duration_us,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args or {}
+        })
+
+@contextmanager
+def phase(name: str, **args):
+    """
+    Time a block of code when tracing is enabled; a no-op otherwise.
+
+    Args:
+        name: Phase name shown in the trace
+        **args: Extra values attached to the trace event (e.g. region)
+    """
+    if not is_enabled():
+        yield
+        return
+
+    allocated_before = tracemalloc.get_traced_memory()[0]
+    start_us = _now_us()
+    try:
+        yield
+    finally:
+        duration_us = _now_us() - start_us
+        allocated_after, peak = tracemalloc.get_traced_memory()
+        event_args = dict(args)
+        event_args["allocated_bytes"] = allocated_after - allocated_before
+        event_args["traced_peak_bytes"] = peak
+        record(name, start_us, duration_us, event_args)
+
+def traced(name: Optional[str] = None):
+    """
+    Decorator that records every call of a function as a phase.
+
+    Args:
+        name: Phase name (defaults to module.function)
+    """
+    def decorator(func):
+        phase_name = name or f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return func(*args, **kwargs)
+            with phase(phase_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+def begin(name: str, **args) -> None:
+    """
+    Open a phase that ends when the run finishes, e.g. waiting for resource
+    registrations that Pulumi completes after the program function returns.
+
+    Args:
+        name: Phase name shown in the trace
+        **args: Extra values attached to the trace event
+    """
+    if is_enabled():
+        with _lock:
+            _open_phases[name] = (_now_us(), args)
+
+def _close_open_phases() -> None:
+    with _lock:
+        open_phases = list(_open_phases.items())
+        _open_phases.clear()
+    end_us = _now_us()
+    for name, (start_us, args) in open_phases:
+        record(name, start_us, end_us - start_us, args)
+
+def summarize() -> Dict[str, Dict[str, Any]]:
+    """
+    Aggregate the recorded phases by name.
+
+    Returns:
+        Mapping of phase name to call count, total/max milliseconds and allocated bytes
+    """
+    summary: Dict[str, Dict[str, Any]] = {}
+    with _lock:
+        events = list(_events)
+    for event in events:
+        entry = summary.setdefault(event["name"], {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "allocated_bytes": 0})
+        duration_ms = event["dur"] / 1000
+        entry["calls"] += 1
+        entry["total_ms"] += duration_ms
+        entry["max_ms"] = max(entry["max_ms"], duration_ms)
+        entry["allocated_bytes"] += event["args"].get("allocated_bytes", 0)
+    return summary
+
+def write_trace(path: Optional[str] = None) -> Optional[str]:
+    """
+    Write the recorded phases as a Chrome trace JSON file.
+
+    Args:
+        path: Output file (defaults to the path given to enable)
+
+    Returns:
+        Path written, or None if tracing is disabled
+    """
+    path = path or _trace_path
+    if path is None:
+        return None
+
+    _close_open_phases()
+    with _lock:
+        events = sorted(_events, key=lambda event: event["ts"])
+
+    trace = {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "phaseSummary": summarize(),
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(trace, f, indent=2)
+    return path
+
+# Tracing can be switched on before any module code runs
+if os.environ.get(TRACE_FILE_ENV):
+    enable(os.environ[TRACE_FILE_ENV])
@@ -1,9 +1,25 @@
 import pulumi_aws as aws
+import pulumi
+import timing.phases as timing
+from typing import List, Optional
 
-def setup_vpc():
-    az = "eu-west-2a"
+@timing.traced()
+def setup_vpc(availability_zones: Optional[List[str]] = None, name_prefix: str = "", opts: Optional[pulumi.ResourceOptions] = None):
+    """
+    Create a VPC with one public subnet per availability zone.
+    
+    Args:
+        availability_zones: AZs to create public subnets in (first one hosts single instances)
+        name_prefix: Prefix for resource names (e.g. the region when deploying several)
+        opts: Resource options, e.g. an explicit regional provider
+    
+    Returns:
+        Dictionary containing VPC, subnet and gateway IDs
+    """
+    availability_zones = availability_zones or ["eu-west-2a"]
+    az = availability_zones[0]
     # Create a new VPC instead of using the default one
-    vpc = aws.ec2.Vpc("production-vpc",
+    vpc = aws.ec2.Vpc(f"{name_prefix}production-vpc",
         cidr_block="172.16.0.0/16",
         enable_dns_hostnames=True,
         enable_dns_support=True,
@@ -11,35 +27,43 @@ def setup_vpc():
             "Name": "production-vpc",
             "Environment": "production",
             "ManagedBy": "pulumi"
-        }
+        },
+        opts=opts
     )
 
     # Create an Internet Gateway
-    internet_gateway = aws.ec2.InternetGateway("production-internet-gateway",
+    internet_gateway = aws.ec2.InternetGateway(f"{name_prefix}production-internet-gateway",
         vpc_id=vpc.id,
         tags={
             "Name": "production-internet-gateway",
             "Environment": "production",
             "ManagedBy": "pulumi"
-        }
+        },
+        opts=opts
     )
 
-    # Create a public subnet
-    public_subnet = aws.ec2.Subnet("production-public-subnet",
-        vpc_id=vpc.id,
-        cidr_block="172.16.10.0/24",
-        availability_zone=az,  # Updated to match the user's AWS region
-        map_public_ip_on_launch=True,
-        tags={
-            "Name": "production-public-subnet",
-            "Environment": "production",
-            "Type": "public",
-            "ManagedBy": "pulumi"
-        }
-    )
+    # Create a public subnet per availability zone
+    public_subnets = []
+    for i, subnet_az in enumerate(availability_zones):
+        # The first subnet keeps its original name so existing stacks are unchanged
+        suffix = "" if i == 0 else f"-{i+1}"
+        public_subnet = aws.ec2.Subnet(f"{name_prefix}production-public-subnet{suffix}",
+            vpc_id=vpc.id,
+            cidr_block=f"172.16.{10 + i}.0/24",
+            availability_zone=subnet_az,
+            map_public_ip_on_launch=True,
+            tags={
+                "Name": f"production-public-subnet{suffix}",
+                "Environment": "production",
+                "Type": "public",
+                "ManagedBy": "pulumi"
+            },
+            opts=opts
+        )
+        public_subnets.append(public_subnet)
 
     # Create a route table for public subnets
-    public_route_table = aws.ec2.RouteTable("production-public-route-table",
+    public_route_table = aws.ec2.RouteTable(f"{name_prefix}production-public-route-table",
         vpc_id=vpc.id,
         routes=[{
             "cidr_block": "0.0.0.0/0",
@@ -50,18 +74,24 @@ def setup_vpc():
             "Environment": "production",
             "Type": "public",
             "ManagedBy": "pulumi"
-        }
+        },
+        opts=opts
     )
 
-    # Associate the public subnet with the route table
-    public_route_table_association = aws.ec2.RouteTableAssociation("production-public-subnet-association",
-        subnet_id=public_subnet.id,
-        route_table_id=public_route_table.id
-    )
+    # Associate the public subnets with the route table
+    for i, public_subnet in enumerate(public_subnets):
+        suffix = "" if i == 0 else f"-{i+1}"
+        aws.ec2.RouteTableAssociation(f"{name_prefix}production-public-subnet-association{suffix}",
+            subnet_id=public_subnet.id,
+            route_table_id=public_route_table.id,
+            opts=opts
+        )
 
     return {
         "vpc_id": vpc.id,
-        "public_subnet_id": public_subnet.id,
+        "public_subnet_id": public_subnets[0].id,
+        "public_subnet_ids": [public_subnet.id for public_subnet in public_subnets],
         "internet_gateway_id": internet_gateway.id,
-        "availability_zone": az
+        "availability_zone": az,
+        "availability_zones": availability_zones
     }